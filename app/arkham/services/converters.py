@@ -1,17 +1,44 @@
+import io
 import os
+import csv
 import logging
+import mmap
 import plistlib
 import re
 import json
-import docx
-import extract_msg
 from email import policy
 from email.parser import BytesParser
-from PIL import Image
+from datetime import datetime
+from itertools import groupby
+from html.parser import HTMLParser
 from typing import Optional, Dict, Any, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Markdown tables: runs of lines that start and end with a pipe and contain at
+# least one inner pipe (surrounding whitespace allowed). The first inner
+# segment excludes pipes so a long line of pipes can't backtrack quadratically.
+_MD_TABLE_BLOCK_RE = re.compile(r'(?:^[^\S\n]*\|[^\n|]*\|[^\n]*\|[^\S\n]*(?:\n|\Z))+', re.MULTILINE)
+_MD_SEPARATOR_RE = re.compile(r'[|\-: ]+')
+
+# Prefer orjson (C/Rust) for encoding table headers, fall back to stdlib json
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _dumps = json.dumps
+
+# CSV dialect detection: sniff a small leading sample
+_CSV_SNIFFER = csv.Sniffer()
+_CSV_SNIFF_BYTES = 4096
+
+# Read buffer for streamed text files (default io buffer is only 8 KiB)
+_READ_BUF = 1 << 20
+# Text files at least this large are decoded from an mmap instead of read()
+_MMAP_THRESHOLD = 8 << 20
+
 
 # =============================================================================
 # TEXT-BASED FILE DETECTION
@@ -62,37 +89,61 @@ def extract_text_direct(file_path: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def _read_text(file_path: str) -> str:
+    """
+    Read a whole text file as UTF-8 in one go.
+
+    The raw bytes are decoded once rather than through TextIOWrapper's
+    incremental decoder; newlines are normalized the same way text mode would.
+    Large files are memory-mapped and decoded straight from the mapping, so
+    no private copy of the raw bytes is held alongside the decoded text.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Decoded text with undecodable bytes replaced
+    """
+    with open(file_path, "rb", buffering=_READ_BUF) as f:
+        if os.fstat(f.fileno()).st_size >= _MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, "utf-8", "replace")
+        else:
+            text = f.read().decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
 def _extract_txt(file_path: str) -> Dict[str, Any]:
     """Extract text from plain text file."""
-    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-        text = f.read()
-    return {"text": text, "metadata": {}}
+    return {"text": _read_text(file_path), "metadata": {}}
 
 
 def _extract_csv(file_path: str) -> Dict[str, Any]:
     """Extract CSV file as a table with markers."""
-    import csv
-
-    with open(file_path, "r", encoding="utf-8", errors="replace", newline='') as f:
-        # Try to detect delimiter
-        sample = f.read(4096)
+    with open(file_path, "r", encoding="utf-8", errors="replace", newline='', buffering=_READ_BUF) as f:
+        # Try to detect delimiter from the first block only
+        sample = f.read(_CSV_SNIFF_BYTES)
         f.seek(0)
-
         try:
-            dialect = csv.Sniffer().sniff(sample)
+            dialect = _CSV_SNIFFER.sniff(sample)
         except csv.Error:
             dialect = csv.excel  # Default to comma-separated
 
-        reader = csv.reader(f, dialect)
-        rows = list(reader)
-
-    if not rows:
+        # Stream rows straight into the table instead of materializing them
+        table_lines = ["=== TABLE 1 ==="]
+        row_count = 0
+        col_count = 0
+        for row in csv.reader(f, dialect):
+            if not row_count:
+                col_count = len(row)
+            table_lines.append(" | ".join(cell.strip() for cell in row))
+            row_count += 1
+
+    if not row_count:
         return {"text": "", "metadata": {}}
 
-    # Build table with markers
-    table_lines = ["=== TABLE 1 ==="]
-    for row in rows:
-        table_lines.append(" | ".join(cell.strip() for cell in row))
     table_lines.append("=== END TABLE 1 ===")
 
     text = "\n".join(table_lines)
@@ -100,8 +151,8 @@ def _extract_csv(file_path: str) -> Dict[str, Any]:
     return {
         "text": text,
         "metadata": {
-            "row_count": len(rows),
-            "col_count": len(rows[0]) if rows else 0,
+            "row_count": row_count,
+            "col_count": col_count,
         }
     }
 
@@ -115,58 +166,96 @@ def _extract_md(file_path: str) -> Dict[str, Any]:
     |---------|---------|
     | Cell1   | Cell2   |
     """
-    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-        text = f.read()
+    text = _read_text(file_path)
 
-    # Find markdown tables and convert them
-    # Pattern: lines starting with | and containing |
-    lines = text.split('\n')
-    result_lines = []
-    table_buffer = []
+    # Find markdown table blocks in one regex pass and splice in our markers
+    parts = []
     table_count = 0
-    in_table = False
+    pos = 0
+
+    for match in _MD_TABLE_BLOCK_RE.finditer(text):
+        block = match.group()
+        ends_with_newline = block.endswith('\n')
+        if ends_with_newline:
+            block = block[:-1]
+
+        table_count += 1
+        parts.append(text[pos:match.start()])
+        parts.append(f"=== TABLE {table_count} ===\n")
+
+        for line in block.split('\n'):
+            stripped = line.strip()
+            # Skip separator rows (|---|---|)
+            if _MD_SEPARATOR_RE.fullmatch(stripped):
+                continue
+            # Extract cells, removing outer pipes
+            cells = [cell.strip() for cell in stripped[1:-1].split('|')]
+            parts.append(" | ".join(cells))
+            parts.append('\n')
 
-    for line in lines:
-        stripped = line.strip()
-
-        # Check if this is a table row
-        is_table_row = stripped.startswith('|') and stripped.endswith('|') and '|' in stripped[1:-1]
-        # Check if this is a separator row (|---|---|)
-        is_separator = is_table_row and all(c in '|-: ' for c in stripped)
-
-        if is_table_row:
-            if not in_table:
-                # Starting a new table
-                in_table = True
-                table_count += 1
-                table_buffer = [f"=== TABLE {table_count} ==="]
-
-            if not is_separator:
-                # Extract cells, removing outer pipes
-                cells = [cell.strip() for cell in stripped[1:-1].split('|')]
-                table_buffer.append(" | ".join(cells))
-        else:
-            if in_table:
-                # End of table
-                table_buffer.append(f"=== END TABLE {table_count} ===")
-                result_lines.append('\n'.join(table_buffer))
-                table_buffer = []
-                in_table = False
+        parts.append(f"=== END TABLE {table_count} ===")
+        if ends_with_newline:
+            parts.append('\n')
+        pos = match.end()
 
-            result_lines.append(line)
+    parts.append(text[pos:])
 
-    # Handle table at end of file
-    if in_table:
-        table_buffer.append(f"=== END TABLE {table_count} ===")
-        result_lines.append('\n'.join(table_buffer))
+    return {"text": ''.join(parts), "metadata": {}}
 
-    return {"text": '\n'.join(result_lines), "metadata": {}}
 
+# (RFC 822 header, metadata key) pairs collected from every parsed email
+_EMAIL_HEADER_KEYS = tuple(
+    (header, f"email_{header.replace('-', '_')}")
+    for header in ("subject", "from", "to", "cc", "date", "message-id", "in-reply-to")
+)
 
-def _extract_eml(file_path: str) -> Dict[str, Any]:
-    """Extract text and metadata from .eml file."""
-    with open(file_path, "rb") as f:
-        msg = BytesParser(policy=policy.default).parse(f)
+
+def _email_header(metadata: Dict[str, Any]) -> str:
+    """Header block prepended to email bodies for search and PDF rendering."""
+    return (
+        f"Subject: {metadata['email_subject']}\n"
+        f"From: {metadata['email_from']}\n"
+        f"To: {metadata['email_to']}\n"
+        f"CC: {metadata['email_cc']}\n"
+        f"Date: {metadata['email_date']}\n\n"
+    )
+
+
+def _parse_email(raw) -> Tuple[Dict[str, str], str]:
+    """
+    Parse raw RFC 822 message bytes into (metadata, body).
+
+    Uses fast_mail_parser (Rust) when installed and falls back to the stdlib
+    email parser otherwise. HTML-only bodies are stripped to plain text.
+    """
+    try:
+        from fast_mail_parser import parse_email
+
+        # Only accepts bytes; a no-op when raw already is bytes
+        mail = parse_email(bytes(raw))
+        # fast_mail_parser >= 0.10 returns every header as a list of values
+        headers = {
+            name.lower(): ", ".join(value) if isinstance(value, list) else value
+            for name, value in mail.headers.items()
+        }
+        metadata = {
+            meta_key: headers.get(header, "") for header, meta_key in _EMAIL_HEADER_KEYS
+        }
+        metadata["email_subject"] = mail.subject or metadata["email_subject"]
+        metadata["email_date"] = mail.date or metadata["email_date"]
+        if mail.text_plain:
+            body = mail.text_plain[0]
+        elif mail.text_html:
+            body = _strip_html(mail.text_html[0])
+        else:
+            body = ""
+        return metadata, body
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.debug(f"fast_mail_parser failed, falling back to stdlib parser: {e}")
+
+    msg = BytesParser(policy=policy.default).parse(io.BytesIO(raw))
 
     # Extract body
     body_part = msg.get_body(preferencelist=("plain", "html"))
@@ -180,25 +269,18 @@ def _extract_eml(file_path: str) -> Dict[str, Any]:
 
     # Extract metadata
     metadata = {
-        "email_subject": str(msg.get("subject", "")),
-        "email_from": str(msg.get("from", "")),
-        "email_to": str(msg.get("to", "")),
-        "email_cc": str(msg.get("cc", "")),
-        "email_date": str(msg.get("date", "")),
-        "email_message_id": str(msg.get("message-id", "")),
-        "email_in_reply_to": str(msg.get("in-reply-to", "")),
+        meta_key: str(msg.get(header, "")) for header, meta_key in _EMAIL_HEADER_KEYS
     }
+    return metadata, body
 
-    # Build full text with headers for search
-    header_text = f"""Subject: {metadata['email_subject']}
-From: {metadata['email_from']}
-To: {metadata['email_to']}
-CC: {metadata['email_cc']}
-Date: {metadata['email_date']}
 
-"""
+def _extract_eml(file_path: str) -> Dict[str, Any]:
+    """Extract text and metadata from .eml file."""
+    with open(file_path, "rb") as f:
+        metadata, body = _parse_email(f.read())
 
-    return {"text": header_text + body, "metadata": metadata}
+    # Build full text with headers for search
+    return {"text": _email_header(metadata) + body, "metadata": metadata}
 
 
 def _extract_emlx(file_path: str) -> Dict[str, Any]:
@@ -210,55 +292,37 @@ def _extract_emlx(file_path: str) -> Dict[str, Any]:
     - Followed by: RFC 822 email message
     - Followed by: XML plist with Apple Mail metadata
     """
+    # Read the file once into a preallocated buffer and slice it via memoryview.
+    # Both email parsers and plistlib take their own copy of the section they
+    # parse, so each section is copied exactly once, by its parser.
+    buf = bytearray(os.path.getsize(file_path))
     with open(file_path, "rb") as f:
-        content = f.read()
+        size = f.readinto(buf)
+    content = memoryview(buf)[:size]
 
     # First line is the byte count
-    first_newline = content.find(b"\n")
+    first_newline = buf.find(b"\n", 0, size)
     if first_newline == -1:
         raise ValueError("Invalid emlx format: no newline found")
 
     try:
-        byte_count = int(content[:first_newline].decode("ascii").strip())
+        byte_count = int(bytes(content[:first_newline]).decode("ascii").strip())
     except ValueError:
         # Some emlx files don't have the byte count, treat as raw email
-        byte_count = len(content)
+        byte_count = size
         first_newline = -1
 
     # Extract the email portion
     email_start = first_newline + 1
     email_end = email_start + byte_count
-    email_data = content[email_start:email_end]
 
-    # Parse the email
-    msg = BytesParser(policy=policy.default).parsebytes(email_data)
-
-    # Extract body
-    body_part = msg.get_body(preferencelist=("plain", "html"))
-    if body_part:
-        body = body_part.get_content()
-        if body_part.get_content_type() == "text/html":
-            body = _strip_html(body)
-    else:
-        body = ""
-
-    # Extract email metadata
-    metadata = {
-        "email_subject": str(msg.get("subject", "")),
-        "email_from": str(msg.get("from", "")),
-        "email_to": str(msg.get("to", "")),
-        "email_cc": str(msg.get("cc", "")),
-        "email_date": str(msg.get("date", "")),
-        "email_message_id": str(msg.get("message-id", "")),
-        "email_in_reply_to": str(msg.get("in-reply-to", "")),
-    }
+    metadata, body = _parse_email(content[email_start:email_end])
 
     # Try to extract Apple Mail plist metadata
     try:
-        plist_start = content.find(b"<?xml", email_end)
+        plist_start = buf.find(b"<?xml", email_end, size)
         if plist_start != -1:
-            plist_data = content[plist_start:]
-            apple_meta = plistlib.loads(plist_data)
+            apple_meta = plistlib.loads(content[plist_start:])
             # Common Apple Mail metadata fields
             if "flags" in apple_meta:
                 metadata["apple_flags"] = apple_meta["flags"]
@@ -268,19 +332,13 @@ def _extract_emlx(file_path: str) -> Dict[str, Any]:
         logger.debug(f"Could not parse Apple Mail plist: {e}")
 
     # Build full text with headers
-    header_text = f"""Subject: {metadata['email_subject']}
-From: {metadata['email_from']}
-To: {metadata['email_to']}
-CC: {metadata['email_cc']}
-Date: {metadata['email_date']}
-
-"""
-
-    return {"text": header_text + body, "metadata": metadata}
+    return {"text": _email_header(metadata) + body, "metadata": metadata}
 
 
 def _extract_msg_text(file_path: str) -> Dict[str, Any]:
     """Extract text and metadata from .msg file (Outlook format)."""
+    import extract_msg
+
     msg = extract_msg.Message(file_path)
 
     metadata = {
@@ -291,18 +349,10 @@ def _extract_msg_text(file_path: str) -> Dict[str, Any]:
         "email_date": str(msg.date) if msg.date else "",
     }
 
-    header_text = f"""Subject: {metadata['email_subject']}
-From: {metadata['email_from']}
-To: {metadata['email_to']}
-CC: {metadata['email_cc']}
-Date: {metadata['email_date']}
-
-"""
-
     body = msg.body or ""
     msg.close()
 
-    return {"text": header_text + body, "metadata": metadata}
+    return {"text": _email_header(metadata) + body, "metadata": metadata}
 
 
 def _extract_docx_text(file_path: str) -> Optional[Dict[str, Any]]:
@@ -329,67 +379,50 @@ def _extract_docx_text(file_path: str) -> Optional[Dict[str, Any]]:
         logger.warning(f"Could not get file stats: {stat_err}")
 
     try:
-        doc = docx.Document(file_path)
-        logger.info(f"DOCX opened successfully. Paragraphs: {len(doc.paragraphs)}, Tables: {len(doc.tables)}")
-
         text_parts = []
-
-        # Extract all paragraph text
+        table_parts = []
+        table_count = 0
         para_count = 0
-        for para in doc.paragraphs:
-            if para.text.strip():
-                text_parts.append(para.text)
-                para_count += 1
-        logger.info(f"Extracted {para_count} non-empty paragraphs")
 
-        # Extract tables
-        table_count = 0
-        for table_idx, table in enumerate(doc.tables):
+        # Stream word/document.xml instead of building python-docx's object model
+        for kind, content in _iter_docx_body(file_path):
+            if kind == "p":
+                if content.strip():
+                    text_parts.append(content)
+                    para_count += 1
+                continue
+
+            table_idx = table_count
+            open_marker = f"\n=== TABLE {table_idx + 1} ==="
+            close_marker = f"=== END TABLE {table_idx + 1} ===\n"
             try:
-                table_lines = []
-                table_lines.append(f"\n=== TABLE {table_idx + 1} ===")
-
-                row_count = 0
-                for row in table.rows:
-                    cells = [cell.text.strip() for cell in row.cells]
-                    # Deduplicate merged cells (Word tables can repeat content for merged cells)
-                    unique_cells = []
-                    prev_cell = None
-                    for cell in cells:
-                        if cell != prev_cell:
-                            unique_cells.append(cell)
-                            prev_cell = cell
-                    table_lines.append(" | ".join(unique_cells))
-                    row_count += 1
-
-                table_lines.append(f"=== END TABLE {table_idx + 1} ===\n")
-                text_parts.append("\n".join(table_lines))
-                table_count += 1
-                logger.debug(f"Extracted table {table_idx + 1} with {row_count} rows")
+                table_lines = [open_marker]
+
+                for cells in content:
+                    # Deduplicate merged cells (Word tables repeat content for merged cells)
+                    table_lines.append(" | ".join(cell for cell, _ in groupby(cells)))
+
+                table_lines.append(close_marker)
+                # Lines are joined once with everything else, not per table
+                table_parts.extend(table_lines)
+                logger.debug(f"Extracted table {table_idx + 1} with {len(table_lines) - 2} rows")
 
             except Exception as table_err:
                 logger.warning(f"Failed to extract table {table_idx + 1}: {table_err}")
-                continue
+            table_count += 1
 
-        logger.info(f"Extracted {table_count} tables successfully")
+        logger.info(f"Extracted {para_count} non-empty paragraphs")
+        logger.info(f"Extracted {table_count} tables")
 
+        # Paragraph text first, then tables
+        text_parts.extend(table_parts)
         text = "\n".join(text_parts)
         logger.info(f"Total extracted text length: {len(text)} characters")
 
         # Extract core properties as metadata
         metadata = {}
         try:
-            props = doc.core_properties
-            if props.author:
-                metadata["doc_author"] = props.author
-            if props.title:
-                metadata["doc_title"] = props.title
-            if props.subject:
-                metadata["doc_subject"] = props.subject
-            if props.created:
-                metadata["doc_created"] = str(props.created)
-            if props.modified:
-                metadata["doc_modified"] = str(props.modified)
+            metadata = _read_docx_core_properties(file_path)
         except Exception as e:
             logger.debug(f"Could not extract docx properties: {e}")
 
@@ -400,66 +433,331 @@ def _extract_docx_text(file_path: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+# WordprocessingML / OPC core-properties element names
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_BODY = _W_NS + "body"
+_W_P = _W_NS + "p"
+_W_T = _W_NS + "t"
+_W_TAB = _W_NS + "tab"
+_W_BR = _W_NS + "br"
+_W_CR = _W_NS + "cr"
+_W_PTAB = _W_NS + "ptab"
+_W_NO_BREAK_HYPHEN = _W_NS + "noBreakHyphen"
+_W_TYPE = _W_NS + "type"
+_W_TBL = _W_NS + "tbl"
+_W_TR = _W_NS + "tr"
+_W_TC = _W_NS + "tc"
+_W_TR_PR = _W_NS + "trPr"
+_W_TC_PR = _W_NS + "tcPr"
+_W_GRID_BEFORE = _W_NS + "gridBefore"
+_W_GRID_SPAN = _W_NS + "gridSpan"
+_W_VMERGE = _W_NS + "vMerge"
+_W_VAL = _W_NS + "val"
+
+_DOCX_CORE_PROPERTIES = {
+    "{http://purl.org/dc/elements/1.1/}creator": "doc_author",
+    "{http://purl.org/dc/elements/1.1/}title": "doc_title",
+    "{http://purl.org/dc/elements/1.1/}subject": "doc_subject",
+    "{http://purl.org/dc/terms/}created": "doc_created",
+    "{http://purl.org/dc/terms/}modified": "doc_modified",
+}
+
+
+# Run content python-docx renders as text. Only runs that are direct children
+# of the paragraph (or of a hyperlink/smart tag in it) count, so text boxes
+# (w:txbxContent) and mc:AlternateContent fallbacks nested inside a run's
+# drawing are not read into the surrounding sentence.
+_DOCX_RUN_CONTENT = (
+    "*[self::w:t or self::w:tab or self::w:ptab or self::w:br or self::w:cr"
+    " or self::w:noBreakHyphen]"
+)
+_DOCX_RUN_TEXT = {
+    _W_TAB: "\t",
+    _W_PTAB: "\t",
+    _W_CR: "\n",
+    _W_NO_BREAK_HYPHEN: "-",
+}
+
+
+def _docx_run_text(node) -> str:
+    """Text equivalent of one run-content element, as python-docx renders it."""
+    tag = node.tag
+    if tag == _W_T:
+        return node.text or ""
+    if tag == _W_BR:
+        # Page and column breaks produce no text
+        return "\n" if node.get(_W_TYPE, "textWrapping") == "textWrapping" else ""
+    return _DOCX_RUN_TEXT[tag]
+
+
+def _docx_paragraph_text(p, paragraph_nodes) -> str:
+    """Text of a w:p element, rendering tabs and line breaks like python-docx."""
+    return "".join(_docx_run_text(node) for node in paragraph_nodes(p))
+
+
+def _docx_cell_text(tc, cell_nodes) -> str:
+    """
+    Text of a w:tc element: its direct paragraphs joined by newlines.
+
+    cell_nodes is a compiled XPath returning the cell's paragraphs and their
+    run-content nodes in document order, so each cell is one C-side query.
+    """
+    parts = []
+    first_paragraph = True
+    for node in cell_nodes(tc):
+        if node.tag == _W_P:
+            if not first_paragraph:
+                parts.append("\n")
+            first_paragraph = False
+        else:
+            parts.append(_docx_run_text(node))
+    return "".join(parts).strip()
+
+
+def _docx_grid_val(parent, tag: str) -> int:
+    """Integer w:val of parent/tag (gridBefore, gridSpan), 0 when absent."""
+    if parent is not None:
+        node = parent.find(tag)
+        if node is not None:
+            return int(node.get(_W_VAL, 0))
+    return 0
+
+
+def _docx_table_rows(tbl, cell_nodes) -> List[List[str]]:
+    """
+    Cell texts of a w:tbl element, one list per row and one entry per w:tc.
+
+    A vertically merged continuation cell (<w:vMerge/> without
+    val="restart") repeats the text of the cell above it at the same grid
+    column, as python-docx's cell.text does.
+    """
+    rows = []
+    above = {}  # grid column -> resolved text of the cell starting there
+    for tr in tbl.iterchildren(_W_TR):
+        cells = []
+        current = {}
+        col = _docx_grid_val(tr.find(_W_TR_PR), _W_GRID_BEFORE)
+        for tc in tr.iterchildren(_W_TC):
+            tc_pr = tc.find(_W_TC_PR)
+            vmerge = tc_pr.find(_W_VMERGE) if tc_pr is not None else None
+            if vmerge is not None and vmerge.get(_W_VAL, "continue") == "continue":
+                text = above.get(col, "")
+            else:
+                text = _docx_cell_text(tc, cell_nodes)
+            cells.append(text)
+            current[col] = text
+            col += max(1, _docx_grid_val(tc_pr, _W_GRID_SPAN))
+        rows.append(cells)
+        above = current
+    return rows
+
+
+def _iter_docx_body(file_path: str):
+    """
+    Stream the top-level blocks of a .docx body in document order.
+
+    Yields ("p", text) for body paragraphs and ("tbl", rows) for body tables,
+    where rows is a list of cell-text lists. Processed elements are cleared so
+    memory stays bounded on large documents.
+    """
+    import zipfile
+    from lxml import etree
+
+    namespaces = {"w": _W_NS[1:-1]}
+    paragraph_nodes = etree.XPath(
+        "(w:r | w:hyperlink/w:r | w:smartTag/w:r)/" + _DOCX_RUN_CONTENT,
+        namespaces=namespaces,
+    )
+    cell_nodes = etree.XPath(
+        "w:p | (w:p/w:r | w:p/w:hyperlink/w:r | w:p/w:smartTag/w:r)/"
+        + _DOCX_RUN_CONTENT,
+        namespaces=namespaces,
+    )
+
+    with zipfile.ZipFile(file_path) as zf, zf.open("word/document.xml") as xml:
+        for _, elem in etree.iterparse(xml, events=("end",), tag=(_W_P, _W_TBL)):
+            parent = elem.getparent()
+            if parent is None or parent.tag != _W_BODY:
+                # Nested inside a table (or other container); read via its owner
+                continue
+
+            if elem.tag == _W_P:
+                yield "p", _docx_paragraph_text(elem, paragraph_nodes)
+            else:
+                yield "tbl", _docx_table_rows(elem, cell_nodes)
+
+            elem.clear()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+
+def _read_docx_core_properties(file_path: str) -> Dict[str, str]:
+    """Read author/title/subject/created/modified from docProps/core.xml."""
+    import zipfile
+    from lxml import etree
+
+    metadata = {}
+    with zipfile.ZipFile(file_path) as zf:
+        if "docProps/core.xml" not in zf.namelist():
+            return metadata
+        root = etree.fromstring(zf.read("docProps/core.xml"))
+
+    for child in root:
+        key = _DOCX_CORE_PROPERTIES.get(child.tag)
+        value = (child.text or "").strip()
+        if not key or not value:
+            continue
+        if key in ("doc_created", "doc_modified"):
+            # W3CDTF timestamps, rendered the way python-docx's datetimes print
+            try:
+                value = str(datetime.fromisoformat(value.replace("Z", "+00:00")))
+            except ValueError:
+                pass
+        metadata[key] = value
+    return metadata
+
+
 def _extract_html(file_path: str) -> Dict[str, Any]:
     """Extract text from HTML file, including tables with markers."""
-    with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-        html = f.read()
-
-    text_parts = []
+    html = _read_text(file_path)
 
     # Extract tables first, before stripping HTML
     try:
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, 'lxml')
+        from selectolax.lexbor import LexborHTMLParser
 
-        # Extract tables with markers
-        for table_idx, table in enumerate(soup.find_all('table')):
-            table_lines = [f"\n=== TABLE {table_idx + 1} ==="]
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(["script", "style"])
 
-            rows = table.find_all('tr')
-            for row in rows:
-                cells = row.find_all(['th', 'td'])
-                cell_texts = [cell.get_text(strip=True) for cell in cells]
+        # Table blocks are collected as flat lines and joined once at the end
+        table_lines = []
+        for table_idx, table in enumerate(tree.css('table')):
+            rows = []
+            for row in table.css('tr'):
+                cell_texts = [cell.text(strip=True) for cell in row.css('th, td')]
                 if any(cell_texts):  # Skip empty rows
-                    table_lines.append(" | ".join(cell_texts))
+                    rows.append(" | ".join(cell_texts))
 
-            table_lines.append(f"=== END TABLE {table_idx + 1} ===\n")
+            if rows:  # Has actual content
+                if table_lines:
+                    table_lines.append("")  # Blank line between table blocks
+                table_lines.extend(("", f"=== TABLE {table_idx + 1} ==="))
+                table_lines.extend(rows)
+                table_lines.extend((f"=== END TABLE {table_idx + 1} ===", ""))
 
-            if len(table_lines) > 2:  # Has actual content
-                text_parts.append("\n".join(table_lines))
-
-            # Remove table from soup to avoid duplicate extraction
+            # Remove table from the tree to avoid duplicate extraction
             table.decompose()
 
-        # Get remaining text (non-table content)
-        remaining_text = soup.get_text(separator=' ', strip=True)
-        if remaining_text:
-            text_parts.insert(0, remaining_text)  # Put main text first
+        # Get remaining text (non-table content), main text first
+        # Lexbor keeps whitespace-only nodes, so collapse runs like _strip_html does
+        remaining_text = " ".join(tree.root.text(separator=' ').split()) if tree.root else ""
+        text = "\n\n".join(filter(None, (remaining_text, "\n".join(table_lines))))
 
     except ImportError:
-        # Fallback if BeautifulSoup not available (it should be - it's in requirements)
-        logger.warning("BeautifulSoup not available, falling back to simple HTML strip")
-        text_parts.append(_strip_html(html))
+        # Fallback if selectolax not available (it should be - it's in requirements)
+        logger.warning("selectolax not available, falling back to simple HTML strip")
+        text = _strip_html(html)
+
+    return {"text": text, "metadata": {}}
+
+
+class _HTMLTextCollector(HTMLParser):
+    """Collects text nodes in a single pass, skipping <script>/<style> content."""
+
+    _SKIP_TAGS = {"script", "style"}
 
-    return {"text": "\n\n".join(text_parts), "metadata": {}}
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
 
 
 def _strip_html(html: str) -> str:
-    """Simple HTML tag stripper."""
-    # Remove script and style elements
-    html = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    html = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
-    # Remove all tags
-    html = re.sub(r'<[^>]+>', ' ', html)
+    """
+    Simple HTML tag stripper.
+
+    Uses selectolax's lexbor backend (the same engine as _extract_html) when
+    installed, otherwise the stdlib HTMLParser. Either way the document is
+    scanned once instead of once per regex substitution.
+    """
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(["script", "style"])
+        text = tree.root.text(separator=" ") if tree.root else ""
+    except ImportError:
+        collector = _HTMLTextCollector()
+        collector.feed(html)
+        collector.close()
+        text = " ".join(collector.parts)
+
     # Clean up whitespace
-    html = re.sub(r'\s+', ' ', html)
-    return html.strip()
+    return " ".join(text.split())
 
 
 # =============================================================================
 # TABLE EXTRACTION FROM TEXT
 # =============================================================================
 
+_TABLE_OPEN = "=== TABLE "
+_MARKER_TAIL = " ==="
+
+
+def _scan_tables(text: str) -> List[Tuple[int, str]]:
+    """
+    Find "=== TABLE N ===" ... "=== END TABLE N ===" blocks with plain
+    substring search instead of a backreferencing regex.
+
+    Args:
+        text: Extracted document text
+
+    Returns:
+        List of (table_index, raw_content) tuples in document order
+    """
+    blocks = []
+    pos = 0
+    while True:
+        start = text.find(_TABLE_OPEN, pos)
+        if start < 0:
+            break
+        pos = start + 1  # Resume after this marker if it turns out malformed
+
+        num_start = start + len(_TABLE_OPEN)
+        num_end = text.find(_MARKER_TAIL, num_start)
+        number = text[num_start:num_end]
+        if num_end < 0 or not number.isdecimal():
+            continue
+
+        # The open marker must be followed by optional whitespace and a newline
+        after = num_end + len(_MARKER_TAIL)
+        newline = text.find("\n", after)
+        if newline < 0 or text[after:newline].strip():
+            continue
+        content_start = newline + 1
+
+        close = f"=== END TABLE {number} ==="
+        end = text.find(close, content_start)
+        if end < 0:
+            continue
+
+        blocks.append((int(number), text[content_start:end]))
+        pos = end + len(close)
+
+    return blocks
+
+
 def extract_tables_from_text(text: str) -> List[Dict[str, Any]]:
     """
     Parse table markers from extracted text and return table metadata.
@@ -475,15 +773,8 @@ def extract_tables_from_text(text: str) -> List[Dict[str, Any]]:
     """
     tables = []
 
-    # Pattern to match table blocks
-    table_pattern = re.compile(
-        r'=== TABLE (\d+) ===\s*\n(.*?)=== END TABLE \1 ===',
-        re.DOTALL
-    )
-
-    for match in table_pattern.finditer(text):
-        table_index = int(match.group(1))
-        table_content = match.group(2).strip()
+    for table_index, table_content in _scan_tables(text):
+        table_content = table_content.strip()
 
         if not table_content:
             continue
@@ -507,7 +798,7 @@ def extract_tables_from_text(text: str) -> List[Dict[str, Any]]:
             "page_num": 1,  # Text files are treated as single page
             "row_count": row_count,
             "col_count": col_count,
-            "headers": json.dumps(headers),
+            "headers": _dumps(headers),
             "text_content": text_content,
         })
 
@@ -561,49 +852,26 @@ def _convert_docx_to_pdf(docx_path, pdf_path):
     # but that introduces heavy dependencies. For v0.1, text extraction is key.
     from reportlab.pdfgen import canvas
     from reportlab.lib.pagesizes import letter
+    import docx
 
     doc = docx.Document(docx_path)
     c = canvas.Canvas(pdf_path, pagesize=letter)
     width, height = letter
-    y = height - 40
-
-    for para in doc.paragraphs:
-        text = para.text
-        # Simple wrapping
-        lines = _simple_wrap(text, 80)
-        for line in lines:
-            if y < 40:
-                c.showPage()
-                y = height - 40
-            c.drawString(40, y, line)
-            y -= 12
 
+    _draw_text_lines(c, (para.text for para in doc.paragraphs), 80, height - 40)
     c.save()
 
 
 def _convert_msg_to_pdf(msg_path, pdf_path):
-    msg = extract_msg.Message(msg_path)
-    _create_text_pdf(
-        msg.body,
-        pdf_path,
-        f"Subject: {msg.subject}\nFrom: {msg.sender}\nTo: {msg.to}\nDate: {msg.date}\n\n",
-    )
-    msg.close()
+    """Convert .msg (Outlook) file to PDF."""
+    extracted = _extract_msg_text(msg_path)
+    _create_text_pdf(extracted["text"], pdf_path)
 
 
 def _convert_eml_to_pdf(eml_path, pdf_path):
-    with open(eml_path, "rb") as f:
-        msg = BytesParser(policy=policy.default).parse(f)
-
-    body_part = msg.get_body(preferencelist=("plain", "html"))
-    if body_part:
-        body = body_part.get_content()
-        if body_part.get_content_type() == "text/html":
-            body = _strip_html(body)
-    else:
-        body = ""
-    header = f"Subject: {msg['subject']}\nFrom: {msg['from']}\nTo: {msg['to']}\nDate: {msg['date']}\n\n"
-    _create_text_pdf(body, pdf_path, header)
+    """Convert .eml file to PDF."""
+    extracted = _extract_eml(eml_path)
+    _create_text_pdf(extracted["text"], pdf_path)
 
 
 def _convert_emlx_to_pdf(emlx_path, pdf_path):
@@ -619,6 +887,8 @@ def _convert_html_to_pdf(html_path, pdf_path):
 
 
 def _convert_image_to_pdf(img_path, pdf_path):
+    from PIL import Image
+
     image = Image.open(img_path)
     if image.mode != "RGB":
         image = image.convert("RGB")
@@ -637,20 +907,92 @@ def _create_text_pdf(text, pdf_path, header=""):
 
     c = canvas.Canvas(pdf_path, pagesize=letter)
     width, height = letter
-    y = height - 40
 
     full_text = header + (text or "")
 
-    for line in full_text.split("\n"):
-        wrapped_lines = _simple_wrap(line, 90)
-        for w_line in wrapped_lines:
-            if y < 40:
-                c.showPage()
-                y = height - 40
-            c.drawString(40, y, w_line)
-            y -= 12
+    _draw_text_lines(c, full_text.split("\n"), 90, height - 40)
     c.save()
 
 
+def _draw_text_lines(c, lines, max_chars, top):
+    """
+    Draw wrapped lines onto the canvas, starting a new page when the bottom
+    margin is reached.
+
+    Uses one text object per page rather than a drawString call per line,
+    so each page is emitted as a single BT/ET block.
+    """
+    t = c.beginText(40, top)
+    t.setLeading(12)
+    for line in lines:
+        for w_line in _simple_wrap(line, max_chars):
+            if t.getY() < 40:
+                c.drawText(t)
+                c.showPage()
+                t = c.beginText(40, top)
+                t.setLeading(12)
+            t.textLine(w_line)
+    c.drawText(t)
+
+
 def _simple_wrap(text, max_chars):
+    # Most lines fit: return them as-is without building slices
+    if len(text) <= max_chars:
+        return [text] if text else []
     return [text[i : i + max_chars] for i in range(0, len(text), max_chars)]
+
+
+# =============================================================================
+# BATCH HELPERS (for bulk imports outside the per-file RQ jobs)
+# =============================================================================
+
+def _batch_chunksize(count: int, workers: int) -> int:
+    # A few chunks per worker keeps IPC overhead low without starving stragglers
+    return max(1, count // (workers * 4))
+
+
+def _convert_or_none(file_path):
+    try:
+        return convert_to_pdf(file_path)
+    except Exception:
+        return None  # convert_to_pdf already logged the failure
+
+
+def convert_batch(paths: List[str], max_workers: Optional[int] = None) -> List[Optional[str]]:
+    """
+    Convert many files to PDF in parallel worker processes.
+
+    Args:
+        paths: Files to convert
+        max_workers: Process count (defaults to os.cpu_count())
+
+    Returns:
+        Converted PDF paths in input order, None for files that failed
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not paths:
+        return []
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(_convert_or_none, paths, chunksize=_batch_chunksize(len(paths), workers)))
+
+
+def extract_text_direct_batch(paths: List[str], max_workers: Optional[int] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Run extract_text_direct() over many files in parallel worker processes.
+
+    Args:
+        paths: Files to extract
+        max_workers: Process count (defaults to os.cpu_count())
+
+    Returns:
+        Extraction results in input order (None where extraction failed)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not paths:
+        return []
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(extract_text_direct, paths, chunksize=_batch_chunksize(len(paths), workers)))
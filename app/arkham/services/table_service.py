@@ -5,68 +5,150 @@ logger = logging.getLogger(__name__)
 from config.settings import DATABASE_URL
 import os
 import csv
+import string
 import json
-from typing import List, Dict, Any, Optional
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import functools
+import contextlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from app.arkham.services.db.models import ExtractedTable, Document
+# Prefer orjson (C/Rust) for decoding stored headers, fall back to stdlib json
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+# Database setup (deferred until a query actually needs it)
+_SessionLocal = None
+_session_init_lock = threading.Lock()
+
+
+def _get_sessionmaker():
+    """Return the module's sessionmaker, creating the engine exactly once."""
+    global _SessionLocal
+    if _SessionLocal is None:
+        with _session_init_lock:
+            # Another thread may have created it while we waited for the lock
+            if _SessionLocal is None:
+                from sqlalchemy import create_engine
+                from sqlalchemy.orm import sessionmaker
+
+                engine = create_engine(
+                    DATABASE_URL,
+                    pool_recycle=300,  # Recycle connections after 5 min
+                    pool_pre_ping=True,  # Test connection before use
+                )
+                # Nothing here writes, so skip autoflush and post-commit expiry
+                _SessionLocal = sessionmaker(
+                    bind=engine, autoflush=False, expire_on_commit=False
+                )
+    return _SessionLocal
+
+
+@contextlib.contextmanager
+def _session():
+    """Yield a read-only session, creating the engine on first use."""
+    session = _get_sessionmaker()()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+# Characters making up a "| --- | --- |" style separator row
+_SEP_PIPE_CHARS = '-=|' + string.whitespace
+
+
+def _is_marker_line(line: str) -> bool:
+    """Check for "=== TABLE N ===", "=== END TABLE N ===" or "TABLE (Page N):"."""
+    if line.startswith('=== ') and line.endswith(' ==='):
+        inner = line[4:-4]
+        if inner.startswith('TABLE '):
+            return inner[6:].isdecimal()
+        if inner.startswith('END TABLE '):
+            return inner[10:].isdecimal()
+        return False
+    if line.startswith('TABLE (Page ') and line.endswith('):'):
+        return line[12:-2].isdecimal()
+    return False
+
 
-# Database setup
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+# Read buffer for exported table CSVs
+_CSV_READ_BUFFER = 1 << 20
 
 
 def get_extracted_tables(limit: int = 20, offset: int = 0) -> Dict[str, Any]:
     """
     Fetch a list of extracted tables with metadata and total count.
-    """
-    session = SessionLocal()
-    try:
-        query = session.query(ExtractedTable, Document).join(
-            Document, ExtractedTable.doc_id == Document.id
-        )
 
-        total_count = query.count()
-
-        tables = (
-            query.order_by(ExtractedTable.created_at.desc())
-            .limit(limit)
-            .offset(offset)
-            .all()
-        )
+    Only the listed columns are selected, and the total is computed with a
+    COUNT(*) OVER () window in the same query instead of a separate count().
+    """
+    from sqlalchemy import select, func
+    from app.arkham.services.db.models import ExtractedTable, Document
 
-        results = []
-        for table, doc in tables:
-            headers = []
-            if table.headers:
-                try:
-                    headers = json.loads(table.headers)
-                except (json.JSONDecodeError, TypeError):
-                    headers = []
-
-            results.append(
-                {
-                    "id": table.id,
-                    "doc_id": doc.id,
-                    "doc_title": doc.title or f"Document {doc.id}",
-                    "page_num": table.page_num,
-                    "row_count": table.row_count,
-                    "col_count": table.col_count,
-                    "headers": headers,
-                    "created_at": table.created_at.strftime("%Y-%m-%d %H:%M"),
-                    "csv_path": table.csv_path,
-                }
+    try:
+        with _session() as session:
+            stmt = (
+                select(
+                    ExtractedTable.id,
+                    ExtractedTable.doc_id,
+                    Document.title,
+                    ExtractedTable.page_num,
+                    ExtractedTable.row_count,
+                    ExtractedTable.col_count,
+                    ExtractedTable.headers,
+                    ExtractedTable.created_at,
+                    ExtractedTable.csv_path,
+                    func.count().over().label("total"),
+                )
+                .join(Document, ExtractedTable.doc_id == Document.id)
+                .order_by(ExtractedTable.created_at.desc())
+                .limit(limit)
+                .offset(offset)
             )
-        return {"items": results, "total": total_count}
+            rows = session.execute(stmt).all()
+
+            if rows:
+                total_count = rows[0].total
+            elif offset:
+                # Page past the end: the window count has no row to ride on
+                total_count = session.query(ExtractedTable).join(
+                    Document, ExtractedTable.doc_id == Document.id
+                ).count()
+            else:
+                total_count = 0
+
+            results = []
+            for row in rows:
+                headers = []
+                if row.headers:
+                    try:
+                        headers = _loads(row.headers)
+                    except (json.JSONDecodeError, TypeError):
+                        headers = []
+
+                results.append(
+                    {
+                        "id": row.id,
+                        "doc_id": row.doc_id,
+                        "doc_title": row.title or f"Document {row.doc_id}",
+                        "page_num": row.page_num,
+                        "row_count": row.row_count,
+                        "col_count": row.col_count,
+                        "headers": headers,
+                        "created_at": row.created_at.isoformat(sep=" ", timespec="minutes"),
+                        "csv_path": row.csv_path,
+                    }
+                )
+            return {"items": results, "total": total_count}
     except Exception as e:
         logger.error(f"Error fetching tables: {e}")
         return {"items": [], "total": 0}
-    finally:
-        session.close()
 
 
 def get_table_content(table_id: int) -> Dict[str, Any]:
@@ -74,64 +156,113 @@ def get_table_content(table_id: int) -> Dict[str, Any]:
     Fetch the content of a specific table.
     Returns a dictionary with 'headers' and 'rows'.
     """
-    session = SessionLocal()
+    from app.arkham.services.db.models import ExtractedTable
+
     try:
-        table = session.query(ExtractedTable).get(table_id)
-        if not table:
-            return {"error": "Table not found"}
-
-        # Try to read from CSV if available
-        if table.csv_path and os.path.exists(table.csv_path):
-            try:
-                rows = []
-                with open(table.csv_path, "r", encoding="utf-8") as f:
-                    reader = csv.reader(f)
-                    headers = next(reader, [])
-                    for row in reader:
-                        rows.append(row)
-                return {
-                    "headers": headers,
-                    "rows": rows,
-                    "csv_path": table.csv_path,
-                }
-            except Exception as e:
-                logger.error(f"Error reading CSV: {e}")
-                # Fallback to text content parsing
-                pass
-
-        # Fallback: Parse text_content if available
-        if table.text_content:
-            try:
-                headers, rows = _parse_table_text_content(table.text_content)
-                if headers or rows:
+        with _session() as session:
+            table = session.get(ExtractedTable, table_id)
+            if not table:
+                return {"error": "Table not found"}
+
+            # Try to read from CSV if available
+            if table.csv_path and os.path.exists(table.csv_path):
+                try:
+                    headers, rows = _read_csv_cached(
+                        table.csv_path, os.path.getmtime(table.csv_path)
+                    )
                     return {
-                        "headers": headers,
-                        "rows": rows,
+                        "headers": list(headers),
+                        "rows": [list(row) for row in rows],
                         "csv_path": table.csv_path,
                     }
-            except Exception as e:
-                logger.warning(f"Error parsing text_content: {e}")
-
-        # Last fallback: if headers are stored in DB but no content
-        headers = []
-        if table.headers:
-            try:
-                headers = json.loads(table.headers)
-            except:
-                pass
-
-        return {
-            "headers": headers,
-            "rows": [],
-            "message": "Full content not available. Showing metadata only.",
-            "csv_path": table.csv_path,
-        }
+                except Exception as e:
+                    logger.error(f"Error reading CSV: {e}")
+                    # Fallback to text content parsing
+                    pass
+
+            # Fallback: Parse text_content if available
+            if table.text_content:
+                try:
+                    headers, rows = _parse_text_cached(
+                        table.id,
+                        table.created_at.timestamp() if table.created_at else 0.0,
+                        table.text_content,
+                    )
+                    if headers or rows:
+                        return {
+                            "headers": headers,
+                            "rows": rows,
+                            "csv_path": table.csv_path,
+                        }
+                except Exception as e:
+                    logger.warning(f"Error parsing text_content: {e}")
+
+            # Last fallback: if headers are stored in DB but no content
+            headers = []
+            if table.headers:
+                try:
+                    headers = _loads(table.headers)
+                except:
+                    pass
+
+            return {
+                "headers": headers,
+                "rows": [],
+                "message": "Full content not available. Showing metadata only.",
+                "csv_path": table.csv_path,
+            }
 
     except Exception as e:
         logger.error(f"Error fetching table content: {e}")
         return {"error": str(e)}
-    finally:
-        session.close()
+
+
+@functools.lru_cache(maxsize=128)
+def _read_csv_cached(path: str, mtime: float) -> tuple:
+    """
+    Read an exported table CSV as (headers, rows).
+
+    Cached per (path, mtime), so a rewritten file is re-read automatically.
+    Returns tuples so callers can't mutate the cached result; copy to lists
+    before handing rows out.
+    """
+    with open(path, "r", encoding="utf-8", newline="", buffering=_CSV_READ_BUFFER) as f:
+        reader = csv.reader(f)
+        headers = tuple(next(reader, []))
+        return headers, tuple(tuple(row) for row in reader)
+
+
+# Parsed text_content per (table_id, version), least recently used first.
+# Entries hold tuples so no caller can mutate a cached parse.
+_TEXT_PARSE_CACHE_SIZE = 256
+_text_parse_cache: "OrderedDict[Tuple[int, float], tuple]" = OrderedDict()
+_text_parse_lock = threading.Lock()
+
+
+def _parse_text_cached(table_id: int, version: float, text_content: str) -> tuple:
+    """
+    Parse a table's stored text_content, cached per (table_id, version).
+
+    Extracted tables are written once, so created_at serves as the version.
+    The text is only parsed on a miss and is not part of the key, so the
+    cache doesn't pin large table texts in memory. Callers get fresh lists.
+    """
+    key = (table_id, version)
+    with _text_parse_lock:
+        cached = _text_parse_cache.get(key)
+        if cached is not None:
+            _text_parse_cache.move_to_end(key)
+
+    if cached is None:
+        headers, rows = _parse_table_text_content(text_content)
+        cached = (tuple(headers), tuple(tuple(row) for row in rows))
+        with _text_parse_lock:
+            _text_parse_cache[key] = cached
+            if len(_text_parse_cache) > _TEXT_PARSE_CACHE_SIZE:
+                _text_parse_cache.popitem(last=False)
+
+    headers, rows = cached
+    return list(headers), [list(row) for row in rows]
 
 
 def _parse_table_text_content(text_content: str) -> tuple:
@@ -153,31 +284,13 @@ def _parse_table_text_content(text_content: str) -> tuple:
     Returns:
         tuple of (headers: List[str], rows: List[List[str]])
     """
-    import re
-
-    content = text_content.strip()
-
-    if not content:
-        return [], []
-
-    # Remove various table markers
-    # Format 1: === TABLE N ===
-    content = re.sub(r'=== TABLE \d+ ===\s*\n?', '', content)
-    content = re.sub(r'=== END TABLE \d+ ===\s*\n?', '', content)
-    # Format 2: TABLE (Page N):
-    content = re.sub(r'TABLE \(Page \d+\):\s*\n?', '', content)
-    content = content.strip()
-
-    if not content:
-        return [], []
-
-    lines = [line.strip() for line in content.split('\n') if line.strip()]
-
-    if not lines:
-        return [], []
-
-    # Filter out separator lines (like ----- or ===)
-    lines = [line for line in lines if not re.match(r'^[-=]+$', line)]
+    # One pass over the lines: drop blanks, marker lines and separators inline
+    lines = []
+    for line in text_content.split('\n'):
+        line = line.strip()
+        if not line or _is_marker_line(line) or not line.strip('-='):
+            continue
+        lines.append(line)
 
     if not lines:
         return [], []
@@ -189,7 +302,7 @@ def _parse_table_text_content(text_content: str) -> tuple:
     rows = []
     for line in lines[1:]:
         # Skip separator lines that might contain pipes
-        if re.match(r'^[\-=\s|]+$', line):
+        if not line.strip(_SEP_PIPE_CHARS):
             continue
         cells = [cell.strip() for cell in line.split('|')]
         rows.append(cells)
@@ -33,6 +33,32 @@ from sqlalchemy.orm import sessionmaker
 from .llm_service import chat_with_llm, LLM_EVENTS_ARRAY_SCHEMA
 from .db.models import Document, TimelineEvent
 
+# Date mention patterns, compiled once and matched case-insensitively.
+# Order matters: mentions found at the same position by several patterns
+# keep the date_type of the first one.
+_MONTH = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?"
+_DATE_PATTERNS = [
+    (re.compile(p, re.IGNORECASE), date_type)
+    for p, date_type in [
+        # Full dates with month names (March 15, 2023 | 15 March 2023)
+        (r"\b" + _MONTH + r"\s+\d{1,2},?\s+\d{4}\b", "explicit"),
+        (r"\b\d{1,2}\s+" + _MONTH + r"\s+\d{4}\b", "explicit"),
+        # Numeric dates (03/15/2023, 15-03-2023, 2023-03-15)
+        (r"\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b", "explicit"),
+        (r"\b\d{4}[-/]\d{1,2}[-/]\d{1,2}\b", "explicit"),
+        # Month and year (March 2023, 03/2023)
+        (r"\b" + _MONTH + r"\s+\d{4}\b", "explicit"),
+        (r"\b\d{1,2}[-/]\d{4}\b", "explicit"),
+        # Year only (1990-2099)
+        (r"\b(19\d{2}|20\d{2})\b", "explicit"),
+        # Relative dates
+        (r"\b(today|yesterday|tomorrow|last\s+\w+|next\s+\w+|\d+\s+(?:days?|weeks?|months?|years?)\s+ago)\b", "relative"),
+    ]
+]
+# The relative-date pattern is the only one that can match without a digit
+_DIGITLESS_DATE_PATTERNS = _DATE_PATTERNS[-1:]
+_DIGIT_RE = re.compile(r"\d")
+
 # Database setup
 engine = create_engine(DATABASE_URL)
 Session = sessionmaker(bind=engine)
@@ -102,39 +128,10 @@ def extract_date_mentions(text: str, context_chars: int = 50) -> List[Dict]:
     """
     mentions = []
 
-    # Pattern 1: Full dates with month names (March 15, 2023 | 15 March 2023)
-    pattern1 = r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{1,2},?\s+\d{4}\b"
-    pattern2 = r"\b\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{4}\b"
-
-    # Pattern 3: Numeric dates (03/15/2023, 15-03-2023, 2023-03-15)
-    pattern3 = r"\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b"
-    pattern4 = r"\b\d{4}[-/]\d{1,2}[-/]\d{1,2}\b"
-
-    # Pattern 5: Month and year (March 2023, 03/2023)
-    pattern5 = (
-        r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s+\d{4}\b"
-    )
-    pattern6 = r"\b\d{1,2}[-/]\d{4}\b"
-
-    # Pattern 7: Year only (1990-2099)
-    pattern7 = r"\b(19\d{2}|20\d{2})\b"
-
-    # Pattern 8: Relative dates
-    pattern8 = r"\b(today|yesterday|tomorrow|last\s+\w+|next\s+\w+|\d+\s+(?:days?|weeks?|months?|years?)\s+ago)\b"
-
-    all_patterns = [
-        (pattern1, "explicit"),
-        (pattern2, "explicit"),
-        (pattern3, "explicit"),
-        (pattern4, "explicit"),
-        (pattern5, "explicit"),
-        (pattern6, "explicit"),
-        (pattern7, "explicit"),
-        (pattern8, "relative"),
-    ]
+    patterns = _DATE_PATTERNS if _DIGIT_RE.search(text) else _DIGITLESS_DATE_PATTERNS
 
-    for pattern, date_type in all_patterns:
-        for match in re.finditer(pattern, text, re.IGNORECASE):
+    for regex, date_type in patterns:
+        for match in regex.finditer(text):
             date_text = match.group()
             start_pos = match.start()
             end_pos = match.end()
@@ -17,9 +17,17 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 
 
-@dataclass
+# Cheap screen run before the individual patterns: every built-in pattern
+# needs a digit, except email (needs '@') and the generic API key / GitHub
+# token patterns (need a 32+ character token run). Text without any of these
+# cannot match, so the per-pattern scans are skipped. Keep in sync with
+# PatternDetector.patterns.
+_CANDIDATE_RE = re.compile(r'[\d@]|[A-Za-z0-9_-]{32}')
+
+
+@dataclass(slots=True)
 class PatternMatch:
-    """Represents a detected pattern match."""
+    """Represents a detected pattern match (slotted: many are created per chunk)."""
     pattern_type: str
     match_text: str
     start_pos: int
@@ -33,7 +41,13 @@ class PatternDetector:
     """Detects sensitive data patterns using pre-compiled regex."""
 
     def __init__(self):
-        """Initialize with pre-compiled regex patterns for performance."""
+        """Initialize with pre-compiled regex patterns for performance.
+
+        An optional "requires" entry names a substring every match must
+        contain; the pattern's scan is skipped when the text lacks it.
+        """
+        us_phone_regex = re.compile(r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b')
+
         self.patterns = {
             # Social Security Numbers (US)
             "ssn": {
@@ -53,19 +67,20 @@ class PatternDetector:
             "email": {
                 "regex": re.compile(r'\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b'),
                 "validator": None,  # Basic regex is sufficient
+                "requires": "@",
                 "description": "Email Address"
             },
 
             # Phone Numbers (US)
             "phone_us": {
-                "regex": re.compile(r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b'),
+                "regex": us_phone_regex,
                 "validator": None,
                 "description": "Phone Number (US)"
             },
 
             # Phone Numbers (backward compatibility - maps to phone_us)
             "phone": {
-                "regex": re.compile(r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b'),
+                "regex": us_phone_regex,
                 "validator": None,
                 "description": "Phone Number (US)"
             },
@@ -74,6 +89,7 @@ class PatternDetector:
             "phone_ua": {
                 "regex": re.compile(r'\+380\s?(\d{2})\s?(\d{3})\s?(\d{2})\s?(\d{2})\b'),
                 "validator": self._validate_ukrainian_phone,
+                "requires": "+380",
                 "description": "Phone Number (Ukrainian)"
             },
 
@@ -81,6 +97,7 @@ class PatternDetector:
             "phone_intl": {
                 "regex": re.compile(r'\+\d{1,4}[\s.-]?\d{1,5}[\s.-]?\d{1,5}[\s.-]?\d{1,9}\b'),
                 "validator": self._validate_international_phone,
+                "requires": "+",
                 "description": "Phone Number (International)"
             },
 
@@ -88,6 +105,7 @@ class PatternDetector:
             "ip_address": {
                 "regex": re.compile(r'\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b'),
                 "validator": None,
+                "requires": ".",
                 "description": "IP Address (IPv4)"
             },
 
@@ -102,6 +120,7 @@ class PatternDetector:
             "aws_access_key": {
                 "regex": re.compile(r'\b(AKIA[0-9A-Z]{16})\b'),
                 "validator": None,
+                "requires": "AKIA",
                 "description": "AWS Access Key"
             },
 
@@ -109,6 +128,7 @@ class PatternDetector:
             "github_token": {
                 "regex": re.compile(r'\bghp_[A-Za-z0-9_]{36,}\b'),
                 "validator": None,
+                "requires": "ghp_",
                 "description": "GitHub Personal Access Token"
             },
 
@@ -154,10 +174,15 @@ class PatternDetector:
         Returns:
             List of PatternMatch objects
         """
+        if not _CANDIDATE_RE.search(text):
+            return []
+
         if pattern_types is None:
             pattern_types = list(self.patterns.keys())
 
         matches = []
+        # Patterns sharing a compiled regex (phone / phone_us) scan once
+        spans_by_regex = {}
 
         for pattern_type in pattern_types:
             if pattern_type not in self.patterns:
@@ -167,10 +192,16 @@ class PatternDetector:
             regex = pattern_config["regex"]
             validator = pattern_config["validator"]
 
-            for match in regex.finditer(text):
-                match_text = match.group()
-                start_pos = match.start()
-                end_pos = match.end()
+            required = pattern_config.get("requires")
+            if required and required not in text:
+                continue
+
+            spans = spans_by_regex.get(regex)
+            if spans is None:
+                spans = [(m.group(), m.start(), m.end()) for m in regex.finditer(text)]
+                spans_by_regex[regex] = spans
+
+            for match_text, start_pos, end_pos in spans:
 
                 # Apply validator if present
                 confidence = 1.0
@@ -11,11 +11,14 @@ Features:
 - Overlap management for retrieval context
 """
 
+import os
 import re
 import json
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from functools import partial
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 from app.arkham.services.llm_service import chat_with_llm
 
@@ -51,6 +54,33 @@ PROTECTED_PATTERNS = [
     r'\+\d{1,4}[\s.-]?\d{1,5}[\s.-]?\d{1,5}[\s.-]?\d{1,9}',
 ]
 
+# All protected patterns as one alternation, so the text is scanned only once.
+# Earlier patterns win when several match at the same position. Every pattern
+# starts with '=', '+', '(' or a digit; the lookahead rejects other positions
+# before any alternative is tried.
+_PROTECTED_RE = re.compile(
+    r"(?=[=+(\d])(?:" + "|".join(f"(?:{pattern})" for pattern in PROTECTED_PATTERNS) + ")",
+    re.DOTALL,
+)
+_PLACEHOLDER_RE = re.compile(r'__PROTECTED_(\d+)__')
+
+
+# Paragraph boundary (blank line)
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\n+')
+
+# Agentic chunking outline limits. The outline JSON must fit in
+# AGENTIC_OUTLINE_MAX_CHARS (2-3k tokens, leaving room for the instructions
+# and the 1000-token reply in a 4k-context local model). Each paragraph shows
+# up to AGENTIC_EDGE_CHARS from its start and end; the edges are halved until
+# the outline fits, and below AGENTIC_MIN_EDGE_CHARS the document is chunked
+# without the LLM.
+AGENTIC_OUTLINE_MAX_CHARS = 8_000
+AGENTIC_EDGE_CHARS = 80
+AGENTIC_MIN_EDGE_CHARS = 20
+
+# Sentence ending (. ! ?) followed by whitespace and a capital letter
+_SENTENCE_BREAK_RE = re.compile(r'[.!?]\s+(?=[A-Z])')
+
 
 def _protect_patterns(text: str) -> Tuple[str, dict]:
     """
@@ -60,19 +90,21 @@ def _protect_patterns(text: str) -> Tuple[str, dict]:
         text: Original text
 
     Returns:
-        Tuple of (protected_text, replacements_dict)
+        Tuple of (protected_text, replacements_dict keyed by placeholder index)
     """
     replacements = {}
-    protected_text = text
-    placeholder_counter = 0
+    seen = {}  # Matched text -> placeholder, so repeats share one entry
 
-    for pattern in PROTECTED_PATTERNS:
-        for match in re.finditer(pattern, protected_text, re.DOTALL):
-            matched_text = match.group()
-            placeholder = f"__PROTECTED_{placeholder_counter}__"
-            replacements[placeholder] = matched_text
-            protected_text = protected_text.replace(matched_text, placeholder, 1)
-            placeholder_counter += 1
+    def _to_placeholder(match: re.Match) -> str:
+        matched_text = match.group()
+        placeholder = seen.get(matched_text)
+        if placeholder is None:
+            index = len(replacements)
+            replacements[index] = matched_text
+            placeholder = seen[matched_text] = f"__PROTECTED_{index}__"
+        return placeholder
+
+    protected_text = _PROTECTED_RE.sub(_to_placeholder, text)
 
     return protected_text, replacements
 
@@ -83,21 +115,20 @@ def _restore_patterns(text: str, replacements: dict) -> str:
 
     Args:
         text: Text with placeholders
-        replacements: Dictionary mapping placeholders to original text
+        replacements: Dictionary mapping placeholder indices to original text
 
     Returns:
         Text with restored patterns
     """
-    restored_text = text
-    for placeholder, original in replacements.items():
-        restored_text = restored_text.replace(placeholder, original)
-    return restored_text
+    return _PLACEHOLDER_RE.sub(
+        lambda m: replacements.get(int(m.group(1)), m.group()), text
+    )
 
 
 def _split_by_paragraphs(text: str) -> List[str]:
     """Split text on paragraph boundaries (double newline)."""
-    paragraphs = re.split(r'\n\n+', text)
-    return [p.strip() for p in paragraphs if p.strip()]
+    paragraphs = _PARAGRAPH_BREAK_RE.split(text)
+    return [p for p in map(str.strip, paragraphs) if p]
 
 
 def _split_by_sentences(text: str) -> List[str]:
@@ -106,10 +137,15 @@ def _split_by_sentences(text: str) -> List[str]:
 
     Looks for period, exclamation, or question mark followed by space and capital letter.
     """
-    # Pattern: sentence ending (. ! ?) followed by space and capital letter
-    sentence_pattern = r'(?<=[.!?])\s+(?=[A-Z])'
-    sentences = re.split(sentence_pattern, text)
-    return [s.strip() for s in sentences if s.strip()]
+    # Match the terminator itself rather than a lookbehind, so the regex engine
+    # can skip ahead to candidate characters, then slice around each match
+    sentences = []
+    start = 0
+    for match in _SENTENCE_BREAK_RE.finditer(text):
+        sentences.append(text[start:match.start() + 1])
+        start = match.end()
+    sentences.append(text[start:])
+    return [s for s in map(str.strip, sentences) if s]
 
 
 def _split_by_characters(text: str, max_size: int) -> List[str]:
@@ -123,104 +159,93 @@ def _split_by_characters(text: str, max_size: int) -> List[str]:
     Returns:
         List of character-level chunks
     """
-    chunks = []
-    for i in range(0, len(text), max_size):
-        chunks.append(text[i:i + max_size])
-    return chunks
+    return [text[i:i + max_size] for i in range(0, len(text), max_size)]
 
 
-def _merge_small_chunks(chunks: List[str], min_size: int) -> List[str]:
+def _iter_merge_small_chunks(chunks: Iterable[str], min_size: int) -> Iterator[str]:
     """
-    Merge chunks smaller than min_size with neighbors.
+    Merge chunks smaller than min_size with neighbors, yielding as they complete.
 
-    Args:
-        chunks: List of text chunks
-        min_size: Minimum chunk size
-
-    Returns:
-        List of merged chunks
+    The most recently completed chunk is held back one step, because a
+    too-small final chunk gets merged into it.
     """
-    if not chunks:
-        return []
-
-    merged = []
-    current_chunk = chunks[0]
-
-    for next_chunk in chunks[1:]:
-        if len(current_chunk) < min_size:
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        return
+
+    held = None  # Last completed chunk, not yet yielded
+    # Accumulate parts and join once on flush instead of re-concatenating
+    current_parts = [first]
+    current_len = len(first)
+
+    for next_chunk in chunks:
+        if current_len < min_size:
             # Merge with next chunk
-            current_chunk = current_chunk + "\n\n" + next_chunk
+            current_parts.append(next_chunk)
+            current_len += len(next_chunk) + 2
         else:
             # Current chunk is large enough, save it
-            merged.append(current_chunk)
-            current_chunk = next_chunk
+            if held is not None:
+                yield held
+            held = "\n\n".join(current_parts)
+            current_parts = [next_chunk]
+            current_len = len(next_chunk)
 
     # Don't forget the last chunk
+    current_chunk = "\n\n".join(current_parts)
     if current_chunk:
         # If last chunk is too small and we have previous chunks, merge with last
-        if len(current_chunk) < min_size and merged:
-            merged[-1] = merged[-1] + "\n\n" + current_chunk
+        if current_len < min_size and held is not None:
+            held = held + "\n\n" + current_chunk
         else:
-            merged.append(current_chunk)
-
-    return merged
-
-
-def _recursive_chunk(text: str, max_size: int, min_size: int) -> List[str]:
-    """
-    Recursively chunk text using paragraph -> sentence -> character boundaries.
+            if held is not None:
+                yield held
+            held = current_chunk
 
-    Args:
-        text: Text to chunk
-        max_size: Maximum chunk size
-        min_size: Minimum chunk size
+    if held is not None:
+        yield held
 
-    Returns:
-        List of chunks
-    """
-    chunks = []
 
+def _iter_split(text: str, max_size: int) -> Iterator[str]:
+    """Yield paragraph/sentence/character pieces of at most max_size, before merging."""
     # Try splitting by paragraphs first
     paragraphs = _split_by_paragraphs(text)
 
     for para in paragraphs:
         if len(para) <= max_size:
             # Paragraph fits, keep it
-            chunks.append(para)
+            yield para
         else:
             # Paragraph too large, try sentences
             sentences = _split_by_sentences(para)
 
-            current_chunk = ""
+            # Sentences of the chunk being built, joined once on flush
+            buf = []
+            buf_len = 0  # Length of " ".join(buf)
             for sentence in sentences:
                 if len(sentence) > max_size:
                     # Single sentence too large, character split
-                    if current_chunk:
-                        chunks.append(current_chunk)
-                        current_chunk = ""
+                    if buf:
+                        yield " ".join(buf)
+                        buf = []
+                        buf_len = 0
 
-                    char_chunks = _split_by_characters(sentence, max_size)
-                    chunks.extend(char_chunks)
-                elif len(current_chunk) + len(sentence) + 1 <= max_size:
+                    yield from _split_by_characters(sentence, max_size)
+                elif buf_len + len(sentence) + 1 <= max_size:
                     # Add sentence to current chunk
-                    if current_chunk:
-                        current_chunk += " " + sentence
-                    else:
-                        current_chunk = sentence
+                    buf_len += len(sentence) + 1 if buf else len(sentence)
+                    buf.append(sentence)
                 else:
                     # Current chunk full, start new one
-                    if current_chunk:
-                        chunks.append(current_chunk)
-                    current_chunk = sentence
+                    if buf:
+                        yield " ".join(buf)
+                    buf = [sentence]
+                    buf_len = len(sentence)
 
             # Save remaining chunk
-            if current_chunk:
-                chunks.append(current_chunk)
-
-    # Merge small chunks
-    chunks = _merge_small_chunks(chunks, min_size)
-
-    return chunks
+            if buf:
+                yield " ".join(buf)
 
 
 def smart_chunk(text: str, config: Optional[ChunkConfig] = None) -> List[str]:
@@ -228,6 +253,7 @@ def smart_chunk(text: str, config: Optional[ChunkConfig] = None) -> List[str]:
     Intelligently chunk text using recursive splitting strategy.
 
     Strategy:
+    0. Return the text as a single chunk if it already fits
     1. Protect patterns (if enabled)
     2. Split on paragraph boundaries first
     3. If chunks too large, split on sentence boundaries
@@ -247,11 +273,38 @@ def smart_chunk(text: str, config: Optional[ChunkConfig] = None) -> List[str]:
         >>> chunks = smart_chunk(long_document, config)
         >>> print(f"Created {len(chunks)} chunks")
     """
+    if not text or not text.strip():
+        return []
+
+    chunks = list(iter_smart_chunk(text, config))
+    logger.info(f"Smart chunking created {len(chunks)} chunks from {len(text)} characters")
+    return chunks
+
+
+def iter_smart_chunk(text: str, config: Optional[ChunkConfig] = None) -> Iterator[str]:
+    """
+    Generator form of smart_chunk, yielding chunks as they are produced.
+
+    Lets callers persist chunks one at a time instead of holding the whole
+    list; use smart_chunk when the count is needed up front.
+
+    Args:
+        text: Text to chunk
+        config: Chunking configuration (uses defaults if None)
+
+    Yields:
+        Text chunks in document order
+    """
     if config is None:
         config = ChunkConfig()
 
     if not text or not text.strip():
-        return []
+        return
+
+    # Whole document already fits in one chunk: nothing to split or protect
+    if len(text) <= config.max_chunk_size:
+        yield text.strip()
+        return
 
     # Step 1: Protect patterns
     replacements = {}
@@ -260,23 +313,88 @@ def smart_chunk(text: str, config: Optional[ChunkConfig] = None) -> List[str]:
         logger.debug(f"Protected {len(replacements)} patterns")
 
     # Step 2-5: Recursive chunking
-    chunks = _recursive_chunk(text, config.max_chunk_size, config.min_chunk_size)
+    chunks = _iter_merge_small_chunks(
+        _iter_split(text, config.max_chunk_size), config.min_chunk_size
+    )
 
     # Step 6: Restore protected patterns
-    if config.protect_patterns and replacements:
-        chunks = [_restore_patterns(chunk, replacements) for chunk in chunks]
+    if not replacements:
+        yield from chunks
+        return
+    for chunk in chunks:
+        # Most chunks hold no placeholder; a substring check is cheaper than a regex pass
+        yield _restore_patterns(chunk, replacements) if "__PROTECTED_" in chunk else chunk
+
+
+def smart_chunk_batch(
+    texts: List[str],
+    config: Optional[ChunkConfig] = None,
+    workers: Optional[int] = None
+) -> List[List[str]]:
+    """
+    Run smart_chunk over many documents in parallel worker processes.
 
-    logger.info(f"Smart chunking created {len(chunks)} chunks from {len(text)} characters")
-    return chunks
+    Chunking is pure CPU work under the GIL, so independent documents are
+    spread across processes rather than threads.
+
+    Args:
+        texts: Documents to chunk
+        config: Chunking configuration shared by all documents
+        workers: Process count (defaults to os.cpu_count())
+
+    Returns:
+        One list of chunks per input text, in input order
+
+    Example:
+        >>> batches = smart_chunk_batch([doc_a, doc_b], ChunkConfig(max_chunk_size=800))
+    """
+    if not texts:
+        return []
+    if len(texts) == 1:
+        return [smart_chunk(texts[0], config)]
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(texts) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(partial(smart_chunk, config=config), texts, chunksize=chunksize))
+
+
+def _agentic_outline(paragraphs: List[str]) -> Optional[str]:
+    """
+    Build the paragraph outline JSON sent to the LLM by agentic_chunk.
+
+    Returns:
+        Outline JSON of at most AGENTIC_OUTLINE_MAX_CHARS characters, or None
+        if it doesn't fit even with AGENTIC_MIN_EDGE_CHARS edges
+    """
+    edge = AGENTIC_EDGE_CHARS
+    while edge >= AGENTIC_MIN_EDGE_CHARS:
+        outline = json.dumps(
+            [
+                {
+                    "i": i,
+                    "len": len(para),
+                    "head": para[:edge],
+                    "tail": para[-edge:] if len(para) > edge else "",
+                }
+                for i, para in enumerate(paragraphs)
+            ],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        if len(outline) <= AGENTIC_OUTLINE_MAX_CHARS:
+            return outline
+        edge //= 2
+    return None
 
 
 def agentic_chunk(text: str, config: Optional[ChunkConfig] = None) -> List[str]:
     """
     Use LLM to identify semantic break points for intelligent chunking.
 
-    This function asks the LLM to analyze the text and suggest optimal
-    break points based on semantic meaning, topics, and narrative flow.
-    Falls back to smart_chunk if LLM is unavailable or fails.
+    This function sends the LLM a numbered outline of the paragraphs and asks
+    which ones should end a chunk, based on semantic meaning, topics, and
+    narrative flow. Falls back to smart_chunk if LLM is unavailable or fails.
 
     Args:
         text: Text to chunk
@@ -295,25 +413,36 @@ def agentic_chunk(text: str, config: Optional[ChunkConfig] = None) -> List[str]:
     if not text or not text.strip():
         return []
 
+    # The LLM picks cuts between paragraphs from a compact outline, so it sees
+    # the whole document instead of a truncated prefix
+    paragraphs = _split_by_paragraphs(text)
+    if len(paragraphs) < 2:
+        return smart_chunk(text, config)
+    outline = _agentic_outline(paragraphs)
+    if outline is None:
+        logger.info(
+            f"Outline of {len(paragraphs)} paragraphs exceeds the agentic prompt budget, using smart_chunk"
+        )
+        return smart_chunk(text, config)
+
     # Prepare prompt for LLM
-    prompt = f"""Analyze the following text and identify optimal semantic break points for chunking.
+    prompt = f"""Below is an outline of a document split into numbered paragraphs.
+Each entry gives the paragraph index, its length in characters, and its first and last words.
 
-The goal is to split this text into chunks of approximately {config.max_chunk_size} characters each,
+Choose where to cut the document into chunks of approximately {config.max_chunk_size} characters each,
 while preserving semantic meaning and avoiding breaks in the middle of important concepts.
+Prefer cuts at topic changes and section boundaries.
 
-Return a JSON array of character positions where breaks should occur.
-Only include positions that make semantic sense (topic changes, section boundaries, etc.).
+Return the paragraph indices after which a new chunk should start.
 
 Example response format:
 {{
-    "break_points": [0, 450, 920, 1400],
-    "reasoning": "Brief explanation of why these break points were chosen"
+    "cut_after": [2, 5, 9],
+    "reasoning": "Brief explanation of why these cuts were chosen"
 }}
 
-Text to analyze:
-{text[:2000]}{"... (truncated)" if len(text) > 2000 else ""}
-
-Total text length: {len(text)} characters
+Paragraph outline:
+{outline}
 
 Respond with ONLY valid JSON, no additional commentary."""
 
@@ -342,28 +471,30 @@ Respond with ONLY valid JSON, no additional commentary."""
                 cleaned = parts[1]
 
         data = json.loads(cleaned.strip())
-        break_points = data.get("break_points", [])
+        cut_after = data.get("cut_after", [])
         reasoning = data.get("reasoning", "")
 
         if reasoning:
             logger.info(f"LLM chunking reasoning: {reasoning}")
 
-        # Validate break points
-        if not break_points or not isinstance(break_points, list):
-            logger.warning("Invalid break points from LLM, falling back to smart_chunk")
+        # Validate cut indices
+        if not cut_after or not isinstance(cut_after, list):
+            logger.warning("Invalid cut points from LLM, falling back to smart_chunk")
             return smart_chunk(text, config)
 
-        # Ensure break points are sorted and valid
-        break_points = sorted([bp for bp in break_points if 0 <= bp <= len(text)])
+        # Keep in-range integer indices only, sorted and unique
+        last_index = len(paragraphs) - 1
+        cuts = sorted({
+            cut for cut in cut_after
+            if isinstance(cut, int) and not isinstance(cut, bool) and 0 <= cut < last_index
+        })
 
-        # Create chunks from break points
+        # Create chunks by joining the paragraphs between cuts
         chunks = []
-        for i in range(len(break_points)):
-            start = break_points[i]
-            end = break_points[i + 1] if i + 1 < len(break_points) else len(text)
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
+        start = 0
+        for cut in cuts + [last_index]:
+            chunks.append("\n\n".join(paragraphs[start:cut + 1]))
+            start = cut + 1
 
         # Validate chunks aren't too large or too small
         valid_chunks = []
@@ -420,24 +551,21 @@ def chunk_with_overlap(chunks: List[str], overlap: int) -> List[str]:
     if not chunks or overlap <= 0:
         return chunks
 
-    overlapped_chunks = []
-
-    for i, chunk in enumerate(chunks):
-        enhanced_chunk = chunk
-
-        # Add suffix from previous chunk
-        if i > 0:
-            prev_chunk = chunks[i - 1]
-            suffix = prev_chunk[-overlap:] if len(prev_chunk) >= overlap else prev_chunk
-            enhanced_chunk = suffix + " ... " + enhanced_chunk
-
-        # Add prefix from next chunk
-        if i < len(chunks) - 1:
-            next_chunk = chunks[i + 1]
-            prefix = next_chunk[:overlap] if len(next_chunk) >= overlap else next_chunk
-            enhanced_chunk = enhanced_chunk + " ... " + prefix
-
-        overlapped_chunks.append(enhanced_chunk)
+    # Slice each neighbour's edge once, then build every chunk with a single join
+    suffixes = [chunk[-overlap:] for chunk in chunks]
+    prefixes = [chunk[:overlap] for chunk in chunks]
+    last = len(chunks) - 1
+
+    overlapped_chunks = [
+        "".join((
+            suffixes[i - 1] if i > 0 else "",
+            " ... " if i > 0 else "",
+            chunk,
+            " ... " if i < last else "",
+            prefixes[i + 1] if i < last else "",
+        ))
+        for i, chunk in enumerate(chunks)
+    ]
 
     logger.info(f"Added {overlap}-character overlap to {len(chunks)} chunks")
     return overlapped_chunks
@@ -476,6 +604,10 @@ def chunk_text(
         protect_patterns=protect_patterns
     )
 
+    # Short texts are a single chunk whatever the strategy (skips the LLM call too)
+    if len(text) <= max_chunk_size:
+        return [text.strip()] if text.strip() else []
+
     # Choose chunking strategy
     if use_agentic:
         chunks = agentic_chunk(text, config)
@@ -0,0 +1,97 @@
+"""
+Chunk processing helpers shared by the ingest and parser workers.
+
+- Chunking-strategy lookup from Redis, cached per process
+- Per-chunk analysis: timeline extraction and sensitive-data detection on a
+  chunk's text, returned as plain row dicts for the caller to bulk insert
+"""
+
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The chunking strategy setting changes rarely; re-read it at most this often
+STRATEGY_CACHE_TTL = 30  # seconds
+_strategy_cache = {"value": None, "ts": 0.0}
+
+# Threads analysing chunks concurrently. Timeline extraction makes an LLM
+# call per substantial chunk, so this mostly bounds concurrent LLM requests.
+CHUNK_ANALYSIS_WORKERS = 4
+
+
+def get_chunking_strategy(redis_conn, ttl: float = STRATEGY_CACHE_TTL) -> str:
+    """
+    Return the chunking strategy from Redis, cached for ttl seconds.
+
+    Falls back to "smart" when the key is unset or Redis is unreachable.
+    """
+    now = time.monotonic()
+    if _strategy_cache["value"] is not None and now - _strategy_cache["ts"] < ttl:
+        return _strategy_cache["value"]
+
+    chunking_strategy = "smart"  # Default
+    try:
+        strategy = redis_conn.get("arkham:chunking_strategy")
+        if strategy:
+            chunking_strategy = strategy.decode()
+            logger.info(f"Using chunking strategy from Redis: {chunking_strategy}")
+    except Exception as e:
+        logger.debug(f"Could not read chunking strategy from Redis: {e}")
+
+    _strategy_cache["value"] = chunking_strategy
+    _strategy_cache["ts"] = now
+    return chunking_strategy
+
+
+def analyze_chunk(chunk_text, chunk_id, doc_id):
+    """
+    Run timeline extraction and sensitive-data detection for one chunk.
+
+    Safe to call from worker threads: it only reads the chunk text and
+    returns row dicts, leaving all database writes to the caller.
+
+    Returns:
+        Tuple of (date_mention_rows, timeline_event_rows, sensitive_match_rows)
+    """
+    from app.arkham.services.timeline_service import extract_timeline_from_chunk
+    from app.arkham.services.utils.pattern_detector import detect_sensitive_data
+
+    date_mentions, timeline_events, sensitive_rows = [], [], []
+
+    # Extract timeline information
+    try:
+        date_mentions, timeline_events = extract_timeline_from_chunk(
+            chunk_text, chunk_id, doc_id
+        )
+        if date_mentions or timeline_events:
+            logger.info(
+                f"Extracted {len(date_mentions)} date mentions and {len(timeline_events)} events from chunk {chunk_id}"
+            )
+    except Exception as e:
+        logger.warning(f"Timeline extraction failed for chunk {chunk_id}: {str(e)}")
+
+    # Detect sensitive data patterns
+    try:
+        sensitive_rows = [
+            {
+                "chunk_id": chunk_id,
+                "doc_id": doc_id,
+                "pattern_type": match.pattern_type,
+                "match_text": match.match_text,
+                "confidence": match.confidence,
+                "start_pos": match.start_pos,
+                "end_pos": match.end_pos,
+                "context_before": match.context_before,
+                "context_after": match.context_after,
+            }
+            for match in detect_sensitive_data(chunk_text)
+        ]
+        if sensitive_rows:
+            logger.info(
+                f"Detected {len(sensitive_rows)} sensitive pattern(s) in chunk {chunk_id}"
+            )
+    except Exception as e:
+        logger.warning(f"Sensitive data detection failed for chunk {chunk_id}: {str(e)}")
+
+    return date_mentions, timeline_events, sensitive_rows
@@ -397,3 +397,16 @@ def embed_chunk_job(chunk_id):
         session.rollback()
     finally:
         session.close()
+
+
+def embed_chunks_job(chunk_ids):
+    """
+    Embeds a batch of chunks in one RQ job.
+
+    Runs embed_chunk_job for each ID in order, so a failure on one chunk is
+    logged and the rest of the batch still gets embedded.
+    """
+    for chunk_id in chunk_ids:
+        embed_chunk_job(chunk_id)
+
+    logger.info(f"Embedded batch of {len(chunk_ids)} chunks")
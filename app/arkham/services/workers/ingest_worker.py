@@ -14,12 +14,14 @@ import os
 import sys # Keep sys for shutil
 import shutil
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice, repeat
 from pathlib import Path
 
 from rq import Queue
 from redis import Redis
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
 from sqlalchemy.orm import sessionmaker
 
 from config.settings import DATABASE_URL, REDIS_URL, DOCUMENTS_DIR
@@ -27,10 +29,11 @@ from config.settings import DATABASE_URL, REDIS_URL, DOCUMENTS_DIR
 from app.arkham.services.db.models import Document, Chunk, MiniDoc, DateMention, TimelineEvent, SensitiveDataMatch, ExtractedTable
 from app.arkham.services.utils.hash_utils import get_file_hash
 from app.arkham.services.utils.security_utils import sanitize_filename
-from app.arkham.services.converters import is_text_based_file, extract_text_direct, extract_tables_from_text
-from app.arkham.services.timeline_service import extract_timeline_from_chunk
-from app.arkham.services.utils.pattern_detector import detect_sensitive_data
-from app.arkham.services.utils.smart_chunker import smart_chunk, agentic_chunk, ChunkConfig
+from app.arkham.services.workers.chunk_analysis import (
+    CHUNK_ANALYSIS_WORKERS,
+    analyze_chunk,
+    get_chunking_strategy,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -41,6 +44,9 @@ Session = sessionmaker(bind=engine)
 redis_conn = Redis.from_url(REDIS_URL)
 q = Queue(connection=redis_conn)
 
+# Chunks are inserted (and their derived rows detected) this many at a time
+CHUNK_INSERT_BATCH_SIZE = 200
+
 
 def _process_text_directly(session, doc, extracted_data):
     """
@@ -55,6 +61,10 @@ def _process_text_directly(session, doc, extracted_data):
     Returns:
         Number of chunks created
     """
+    # Only the text passthrough path needs these (smart_chunker pulls in the LLM client)
+    from app.arkham.services.converters import extract_tables_from_text
+    from app.arkham.services.utils.smart_chunker import iter_smart_chunk, agentic_chunk, ChunkConfig
+
     text = extracted_data.get("text", "")
     metadata = extracted_data.get("metadata", {})
 
@@ -110,78 +120,67 @@ def _process_text_directly(session, doc, extracted_data):
     session.add(minidoc)
     session.flush()
 
-    # Determine chunking strategy from Redis
-    chunking_strategy = "smart"  # Default
-    try:
-        strategy = redis_conn.get("arkham:chunking_strategy")
-        if strategy:
-            chunking_strategy = strategy.decode()
-            logger.info(f"Using chunking strategy from Redis: {chunking_strategy}")
-    except Exception as e:
-        logger.debug(f"Could not read chunking strategy from Redis: {e}")
+    # Determine chunking strategy from Redis (cached briefly per worker)
+    chunking_strategy = get_chunking_strategy(redis_conn)
 
     # Chunk the text using smart/agentic chunking
     config = ChunkConfig(max_chunk_size=512, min_chunk_size=100, overlap=50)
 
     if chunking_strategy == "agentic":
         logger.info("Using agentic (LLM-based) chunking for text file")
-        chunks_list = agentic_chunk(text, config)
+        chunks_iter = agentic_chunk(text, config)
     else:
         logger.info("Using smart recursive chunking for text file")
-        chunks_list = smart_chunk(text, config)
-
-    logger.info(f"Created {len(chunks_list)} chunks from {len(text)} characters")
+        # Stream chunks straight into the session instead of materializing the list
+        chunks_iter = iter_smart_chunk(text, config)
 
     chunk_ids = []  # Collect chunk IDs for embedding after commit
-
-    for chunk_index, chunk_text in enumerate(chunks_list):
-
-        chunk = Chunk(
-            doc_id=doc.id,
-            text=chunk_text,
-            chunk_index=chunk_index,
-        )
-        session.add(chunk)
-        session.flush()  # Get ID
-        chunk_ids.append(chunk.id)
-
-        # Extract timeline information
-        try:
-            date_mentions, timeline_events = extract_timeline_from_chunk(
-                chunk_text, chunk.id, doc.id
+    indexed_chunks = enumerate(chunks_iter)
+
+    with ThreadPoolExecutor(max_workers=CHUNK_ANALYSIS_WORKERS) as executor:
+        while True:
+            batch = list(islice(indexed_chunks, CHUNK_INSERT_BATCH_SIZE))
+            if not batch:
+                break
+
+            chunks = [
+                Chunk(doc_id=doc.id, text=chunk_text, chunk_index=chunk_index)
+                for chunk_index, chunk_text in batch
+            ]
+            session.add_all(chunks)
+            session.flush()  # One multi-row INSERT ... RETURNING gets every ID in the batch
+            chunk_ids.extend(chunk.id for chunk in chunks)
+
+            # Analyse the batch concurrently (no DB access), then insert the
+            # derived rows from this thread as plain dicts, once per batch
+            mention_rows = []
+            event_rows = []
+            sensitive_rows = []
+            results = executor.map(
+                analyze_chunk,
+                [chunk.text for chunk in chunks],
+                [chunk.id for chunk in chunks],
+                repeat(doc.id),
             )
-
-            for mention_data in date_mentions:
-                mention = DateMention(**mention_data)
-                session.add(mention)
-
-            for event_data in timeline_events:
-                event = TimelineEvent(**event_data)
-                session.add(event)
-
-        except Exception as e:
-            logger.warning(f"Timeline extraction failed for chunk {chunk.id}: {str(e)}")
-
-        # Detect sensitive data patterns
-        try:
-            sensitive_matches = detect_sensitive_data(chunk_text)
-
-            for match in sensitive_matches:
-                sensitive_data = SensitiveDataMatch(
-                    chunk_id=chunk.id,
-                    doc_id=doc.id,
-                    pattern_type=match.pattern_type,
-                    match_text=match.match_text,
-                    confidence=match.confidence,
-                    start_pos=match.start_pos,
-                    end_pos=match.end_pos,
-                    context_before=match.context_before,
-                    context_after=match.context_after
-                )
-                session.add(sensitive_data)
-
-        except Exception as e:
-            logger.warning(f"Sensitive data detection failed for chunk {chunk.id}: {str(e)}")
+            for date_mentions, timeline_events, sensitive_matches in results:
+                mention_rows.extend(date_mentions)
+                event_rows.extend(timeline_events)
+                sensitive_rows.extend(sensitive_matches)
+
+            # render_nulls keeps rows with None values in the same executemany
+            # batch instead of splitting the statement per column set
+            for model, derived_rows in (
+                (DateMention, mention_rows),
+                (TimelineEvent, event_rows),
+                (SensitiveDataMatch, sensitive_rows),
+            ):
+                if derived_rows:
+                    session.execute(
+                        insert(model).execution_options(render_nulls=True),
+                        derived_rows,
+                    )
+
+    logger.info(f"Created {len(chunk_ids)} chunks from {len(text)} characters")
 
     doc.num_pages = 1  # Text files are treated as single-page
     doc.status = "embedded"  # Mark as ready (embedding jobs will be queued)
@@ -192,8 +191,17 @@ def _process_text_directly(session, doc, extracted_data):
     logger.info(f"Text passthrough: {len(chunk_ids)} chunks committed to database")
 
     # Now enqueue embed jobs - chunks are guaranteed to exist in DB
-    for chunk_id in chunk_ids:
-        q.enqueue("app.arkham.services.workers.embed_worker.embed_chunk_job", chunk_id=chunk_id)
+    # enqueue_many sends them all through one Redis pipeline
+    if chunk_ids:
+        q.enqueue_many(
+            [
+                Queue.prepare_data(
+                    "app.arkham.services.workers.embed_worker.embed_chunk_job",
+                    kwargs={"chunk_id": chunk_id},
+                )
+                for chunk_id in chunk_ids
+            ]
+        )
 
     logger.info(f"Text passthrough complete for doc {doc.id}: {len(chunk_ids)} embed jobs enqueued")
     return len(chunk_ids)
@@ -208,6 +216,8 @@ def process_file(file_path, project_id=None, ocr_mode="paddle"):
         project_id: Optional project ID to associate with the document
         ocr_mode: OCR mode to use - "paddle" (fast) or "qwen" (smart)
     """
+    from app.arkham.services.converters import is_text_based_file, extract_text_direct
+
     logger.info("=" * 80)
     logger.info("INGEST_WORKER: process_file() called")
     logger.info(f"  file_path: {file_path}")
@@ -1,27 +1,119 @@
 from config.settings import DATABASE_URL, REDIS_URL
 import os
+import io
+import csv
+import zlib
 import logging
-from sqlalchemy import create_engine
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from sqlalchemy import create_engine, insert, literal, select, text, union_all
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from rq import Queue
 from redis import Redis
 from dotenv import load_dotenv
 
 from app.arkham.services.db.models import MiniDoc, PageOCR, Chunk, Document, TimelineEvent, DateMention, SensitiveDataMatch, ExtractedTable
-from app.arkham.services.timeline_service import extract_timeline_from_chunk
-from app.arkham.services.utils.pattern_detector import detect_sensitive_data
 from app.arkham.services.utils.smart_chunker import smart_chunk, agentic_chunk, ChunkConfig
+from app.arkham.services.workers.chunk_analysis import (
+    CHUNK_ANALYSIS_WORKERS,
+    analyze_chunk,
+    get_chunking_strategy,
+)
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Setup DB & Redis
-engine = create_engine(DATABASE_URL)
+# psycopg2 only batches executemany UPDATE/DELETE when asked; INSERTs already
+# go through SQLAlchemy's multi-VALUES insertmanyvalues path on every driver
+_engine_kwargs = {}
+if make_url(DATABASE_URL).get_driver_name() == "psycopg2":
+    _engine_kwargs["executemany_mode"] = "values_plus_batch"
+engine = create_engine(
+    DATABASE_URL,
+    pool_recycle=300,  # Recycle connections after 5 min
+    pool_pre_ping=True,  # Test connection before use
+    **_engine_kwargs,
+)
 Session = sessionmaker(bind=engine)
 redis_conn = Redis.from_url(REDIS_URL)
 q = Queue(connection=redis_conn)
 
+# Pages are streamed from the DB in batches of this size while stitching
+PAGE_FETCH_BATCH_SIZE = 64
+
+# On PostgreSQL, MiniDocs with at least this many chunks load them with COPY;
+# below it a multi-VALUES INSERT ... RETURNING is just as fast
+COPY_MIN_CHUNKS = 1000
+
+# Chunks are embedded in batches of this size, one RQ job per batch. A batch
+# embeds and runs NER on every chunk, so it gets a longer timeout than RQ's
+# default
+EMBED_BATCH_SIZE = 100
+EMBED_BATCH_TIMEOUT = "30m"
+
+
+def _copy_chunks(session, doc_id, base_chunk_index, texts):
+    """
+    Load chunk rows with PostgreSQL COPY inside the session's transaction.
+
+    COPY cannot return generated keys, so the new IDs are read back by
+    chunk_index range, skipping any rows a previous run of the same MiniDoc
+    left in that range. That read-back assumes a single writer per range: a
+    transaction-scoped advisory lock on (doc_id, base_chunk_index) makes a
+    concurrent run of the same MiniDoc wait until this transaction ends.
+
+    Args:
+        session: SQLAlchemy session bound to PostgreSQL (psycopg2 or psycopg 3)
+        doc_id: Document the chunks belong to
+        base_chunk_index: chunk_index of the first chunk
+        texts: Chunk texts in order
+
+    Returns:
+        Chunk IDs in the same order as texts
+    """
+    # Collisions between different ranges only serialise unrelated loads
+    lock_key = zlib.crc32(f"{Chunk.__tablename__}:{doc_id}:{base_chunk_index}".encode())
+    session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": lock_key})
+
+    in_range = (
+        Chunk.doc_id == doc_id,
+        Chunk.chunk_index.between(base_chunk_index, base_chunk_index + len(texts) - 1),
+    )
+    existing_ids = set(session.scalars(select(Chunk.id).where(*in_range)))
+
+    # Quote every string so empty text is loaded as '' rather than NULL
+    buf = io.StringIO()
+    writer = csv.writer(buf, quoting=csv.QUOTE_NONNUMERIC, lineterminator="\n")
+    created_at = datetime.utcnow()
+    writer.writerows(
+        (doc_id, chunk_text, base_chunk_index + i, created_at)
+        for i, chunk_text in enumerate(texts)
+    )
+
+    copy_sql = (
+        f"COPY {Chunk.__tablename__} (doc_id, text, chunk_index, created_at) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    cursor = session.connection().connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            buf.seek(0)
+            cursor.copy_expert(copy_sql, buf)
+        else:  # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buf.getvalue())
+    finally:
+        cursor.close()
+
+    chunk_ids = session.scalars(
+        select(Chunk.id).where(*in_range).order_by(Chunk.chunk_index, Chunk.id)
+    ).all()
+    return [chunk_id for chunk_id in chunk_ids if chunk_id not in existing_ids]
+
 
 def parse_minidoc_job(minidoc_db_id):
     """
@@ -36,153 +128,150 @@ def parse_minidoc_job(minidoc_db_id):
 
         logger.info(f"Parsing MiniDoc: {minidoc.minidoc_id}")
 
-        # 1. Fetch Pages
-        pages = (
-            session.query(PageOCR)
-            .filter(
-                PageOCR.document_id == minidoc.document_id,
-                PageOCR.page_num >= minidoc.page_start,
-                PageOCR.page_num <= minidoc.page_end,
-            )
-            .order_by(PageOCR.page_num)
-            .all()
+        # 1. Fetch pages and extracted tables for this minidoc's page range in
+        # one UNION ALL, ordered so each page row is followed by its tables
+        pages_stmt = select(
+            literal(0).label("kind"),
+            PageOCR.page_num.label("page_num"),
+            literal(0).label("sub_index"),
+            PageOCR.text.label("text"),
+        ).where(
+            PageOCR.document_id == minidoc.document_id,
+            PageOCR.page_num >= minidoc.page_start,
+            PageOCR.page_num <= minidoc.page_end,
+        )
+        tables_stmt = select(
+            literal(1).label("kind"),
+            ExtractedTable.page_num.label("page_num"),
+            ExtractedTable.table_index.label("sub_index"),
+            ExtractedTable.text_content.label("text"),
+        ).where(
+            ExtractedTable.doc_id == minidoc.document_id,
+            ExtractedTable.page_num >= minidoc.page_start,
+            ExtractedTable.page_num <= minidoc.page_end,
+        )
+        rows = session.execute(
+            union_all(pages_stmt, tables_stmt)
+            .order_by("page_num", "kind", "sub_index")
+            .execution_options(yield_per=PAGE_FETCH_BATCH_SIZE)
         )
 
-        if not pages:
+        # 2. Stitch text with table injection as the rows stream in. Tables
+        # are only injected into pages that have OCR text.
+        parts = []
+        current_page = None
+        table_count = 0
+        has_content = False  # any non-blank page text or table
+        for kind, page_num, _, row_text in rows:
+            if kind == 1:
+                table_count += 1
+                if page_num == current_page and row_text:
+                    parts.append("\n" + row_text + "\n")
+                    has_content = True
+                continue
+
+            if current_page is not None:
+                parts.append(f"=== PAGE {current_page} END ===\n\n")
+            current_page = page_num
+            parts.append(f"=== PAGE {page_num} START ===\n")
+            parts.append(row_text)
+            parts.append("\n")
+            if row_text and not row_text.isspace():
+                has_content = True
+
+        if current_page is not None:
+            parts.append(f"=== PAGE {current_page} END ===\n\n")
+
+        if table_count:
+            logger.info(f"Found {table_count} extracted tables for pages {minidoc.page_start}-{minidoc.page_end}")
+
+        if not parts:
             logger.warning("No pages found for MiniDoc.")
             return
 
-        # 1.5 Fetch extracted tables for this minidoc's page range
-        extracted_tables = (
-            session.query(ExtractedTable)
-            .filter(ExtractedTable.doc_id == minidoc.document_id)
-            .filter(ExtractedTable.page_num >= minidoc.page_start)
-            .filter(ExtractedTable.page_num <= minidoc.page_end)
-            .order_by(ExtractedTable.page_num, ExtractedTable.table_index)
-            .all()
-        )
-
-        # Group tables by page for injection
-        tables_by_page = {}
-        for table in extracted_tables:
-            if table.page_num not in tables_by_page:
-                tables_by_page[table.page_num] = []
-            tables_by_page[table.page_num].append(table.text_content or "")
-
-        if extracted_tables:
-            logger.info(f"Found {len(extracted_tables)} extracted tables for pages {minidoc.page_start}-{minidoc.page_end}")
-
-        # 2. Stitch Text with table injection
-        full_text = ""
-        for p in pages:
-            full_text += f"=== PAGE {p.page_num} START ===\n"
-            full_text += p.text + "\n"
-
-            # Inject extracted tables for this page
-            if p.page_num in tables_by_page:
-                for table_text in tables_by_page[p.page_num]:
-                    if table_text:
-                        full_text += "\n" + table_text + "\n"
-
-            full_text += f"=== PAGE {p.page_num} END ===\n\n"
-
-        # 3. Determine chunking strategy from Redis
-        chunking_strategy = "smart"  # Default
-        try:
-            strategy = redis_conn.get("arkham:chunking_strategy")
-            if strategy:
-                chunking_strategy = strategy.decode()
-                logger.info(f"Using chunking strategy from Redis: {chunking_strategy}")
-        except Exception as e:
-            logger.debug(f"Could not read chunking strategy from Redis: {e}")
-
-        # 4. Apply smart/agentic chunking
-        config = ChunkConfig(max_chunk_size=512, min_chunk_size=100, overlap=50)
-
-        if chunking_strategy == "agentic":
-            logger.info("Using agentic (LLM-based) chunking")
-            chunks_list = agentic_chunk(full_text, config)
-        else:
-            logger.info("Using smart recursive chunking")
-            chunks_list = smart_chunk(full_text, config)
-
-        logger.info(f"Created {len(chunks_list)} chunks from {len(full_text)} characters")
+        # Blank pages would only yield chunks of page markers, so skip
+        # chunking altogether
+        chunks_list = []
+        if has_content:
+            full_text = "".join(parts)
+            del parts
+
+            # 3. Determine chunking strategy from Redis
+            chunking_strategy = get_chunking_strategy(redis_conn)
+
+            # 4. Apply smart/agentic chunking
+            config = ChunkConfig(max_chunk_size=512, min_chunk_size=100, overlap=50)
+
+            if chunking_strategy == "agentic":
+                logger.info("Using agentic (LLM-based) chunking")
+                chunks_list = agentic_chunk(full_text, config)
+            else:
+                logger.info("Using smart recursive chunking")
+                chunks_list = smart_chunk(full_text, config)
+
+            logger.info(f"Created {len(chunks_list)} chunks from {len(full_text)} characters")
+
+        if not chunks_list:
+            # Nothing to insert, analyse or embed
+            minidoc.status = "parsed"
+            session.commit()
+            logger.info(f"MiniDoc {minidoc.minidoc_id} has no text. Marked parsed with 0 chunks.")
+            return
 
         # Global chunk indexing strategy:
         # MiniDocs are processed in parallel, so we use page_start as a namespace.
-        # Formula: (page_start * 1_000_000) + local_chunk_index
+        # Formula: (page_start * 1_000_000) + position of the chunk in this minidoc
         # This supports up to 1M chunks per minidoc (with 512-char chunks = 512MB text, far exceeding any real document).
-        local_chunk_index = 0
-        chunk_ids_to_embed = []  # Collect chunk IDs for embedding after commit
-
-        for chunk_text in chunks_list:
-
-            # Calculate global chunk index using page_start namespace
-            global_chunk_index = (minidoc.page_start * 1_000_000) + local_chunk_index
-
-            chunk = Chunk(
-                doc_id=minidoc.document_id,
-                text=chunk_text,
-                chunk_index=global_chunk_index,
+        doc_id = minidoc.document_id
+        base_chunk_index = minidoc.page_start * 1_000_000
+        if (
+            len(chunks_list) >= COPY_MIN_CHUNKS
+            and session.get_bind().dialect.name == "postgresql"
+        ):
+            # Very large MiniDocs stream their chunks through COPY
+            chunk_ids = _copy_chunks(session, doc_id, base_chunk_index, chunks_list)
+        else:
+            # Insert every chunk in one executemany and get the IDs back in
+            # parameter order, instead of a flush round-trip per chunk
+            rows = [
+                {
+                    "doc_id": doc_id,
+                    "text": chunk_text,
+                    "chunk_index": base_chunk_index + i,
+                }
+                for i, chunk_text in enumerate(chunks_list)
+            ]
+            chunk_ids = session.scalars(
+                insert(Chunk).returning(Chunk.id, sort_by_parameter_order=True),
+                rows,
+            ).all()
+
+        # Timeline extraction mostly waits on the LLM, so chunks are analysed
+        # on a small thread pool; all DB writes stay on this thread
+        with ThreadPoolExecutor(max_workers=CHUNK_ANALYSIS_WORKERS) as executor:
+            results = list(
+                executor.map(analyze_chunk, chunks_list, chunk_ids, repeat(doc_id))
             )
-            session.add(chunk)
-            session.flush()  # Get ID
-            chunk_ids_to_embed.append(chunk.id)
-
-            # Extract timeline information from chunk
-            try:
-                date_mentions, timeline_events = extract_timeline_from_chunk(
-                    chunk_text, chunk.id, minidoc.document_id
-                )
-
-                # Insert date mentions
-                for mention_data in date_mentions:
-                    mention = DateMention(**mention_data)
-                    session.add(mention)
-
-                # Insert timeline events
-                for event_data in timeline_events:
-                    event = TimelineEvent(**event_data)
-                    session.add(event)
-
-                if date_mentions or timeline_events:
-                    logger.info(
-                        f"Extracted {len(date_mentions)} date mentions and {len(timeline_events)} events from chunk {chunk.id}"
-                    )
-
-            except Exception as e:
-                logger.warning(f"Timeline extraction failed for chunk {chunk.id}: {str(e)}")
-                # Don't fail the entire parsing job if timeline extraction fails
-
-            # Detect sensitive data patterns
-            try:
-                sensitive_matches = detect_sensitive_data(chunk_text)
-
-                for match in sensitive_matches:
-                    sensitive_data = SensitiveDataMatch(
-                        chunk_id=chunk.id,
-                        doc_id=minidoc.document_id,
-                        pattern_type=match.pattern_type,
-                        match_text=match.match_text,
-                        confidence=match.confidence,
-                        start_pos=match.start_pos,
-                        end_pos=match.end_pos,
-                        context_before=match.context_before,
-                        context_after=match.context_after
-                    )
-                    session.add(sensitive_data)
-
-                if sensitive_matches:
-                    logger.info(
-                        f"Detected {len(sensitive_matches)} sensitive pattern(s) in chunk {chunk.id}"
-                    )
 
-            except Exception as e:
-                logger.warning(f"Sensitive data detection failed for chunk {chunk.id}: {str(e)}")
-                # Don't fail the entire parsing job if pattern detection fails
-
-            # Increment local chunk counter for next iteration
-            local_chunk_index += 1
+        # Derived rows are collected across all chunks and inserted in bulk
+        all_mentions, all_events, all_sensitive = [], [], []
+        for date_mentions, timeline_events, sensitive_rows in results:
+            all_mentions.extend(date_mentions)
+            all_events.extend(timeline_events)
+            all_sensitive.extend(sensitive_rows)
+
+        # render_nulls keeps rows with None values in the same executemany
+        # batch instead of splitting the statement per column set
+        for model, derived_rows in (
+            (DateMention, all_mentions),
+            (TimelineEvent, all_events),
+            (SensitiveDataMatch, all_sensitive),
+        ):
+            if derived_rows:
+                session.execute(
+                    insert(model).execution_options(render_nulls=True),
+                    derived_rows,
+                )
 
         minidoc.status = "parsed"
 
@@ -190,14 +279,30 @@ def parse_minidoc_job(minidoc_db_id):
         # This prevents race condition where embed worker can't find chunks
         session.commit()
         logger.info(
-            f"MiniDoc {minidoc.minidoc_id} parsed. {local_chunk_index} chunks committed to database."
+            f"MiniDoc {minidoc.minidoc_id} parsed. {len(chunk_ids)} chunks committed to database."
         )
 
         # Now enqueue embed jobs - chunks are guaranteed to exist in DB
-        for chunk_id in chunk_ids_to_embed:
-            q.enqueue("app.arkham.services.workers.embed_worker.embed_chunk_job", chunk_id=chunk_id)
+        # One job per EMBED_BATCH_SIZE chunks, all sent through one Redis pipeline
+        batches = [
+            chunk_ids[i:i + EMBED_BATCH_SIZE]
+            for i in range(0, len(chunk_ids), EMBED_BATCH_SIZE)
+        ]
+        if batches:
+            q.enqueue_many(
+                [
+                    Queue.prepare_data(
+                        "app.arkham.services.workers.embed_worker.embed_chunks_job",
+                        kwargs={"chunk_ids": batch},
+                        timeout=EMBED_BATCH_TIMEOUT,
+                    )
+                    for batch in batches
+                ]
+            )
 
-        logger.info(f"Enqueued {len(chunk_ids_to_embed)} embed jobs for MiniDoc {minidoc.minidoc_id}")
+        logger.info(
+            f"Enqueued {len(batches)} embed jobs for {len(chunk_ids)} chunks of MiniDoc {minidoc.minidoc_id}"
+        )
 
     except Exception as e:
         logger.error(f"Parser failed: {e}")
@@ -0,0 +1,286 @@
+"""
+Unit tests for document converters.
+
+Tests cover:
+- Email parsing (fast_mail_parser path vs stdlib fallback)
+- DOCX table extraction with merged cells
+- HTML stripping (selectolax lexbor vs stdlib fallback)
+- Markdown table conversion, including pathological pipe-heavy lines
+"""
+
+import sys
+import time
+
+import pytest
+
+from app.arkham.services import converters
+
+
+SAMPLE_EML = (
+    b"From: Alice Example <alice@example.com>\r\n"
+    b"To: bob@example.com, carol@example.com\r\n"
+    b"Cc: dave@example.com\r\n"
+    b"Subject: Quarterly numbers\r\n"
+    b"Date: Wed, 15 Mar 2023 10:00:00 +0000\r\n"
+    b"Message-ID: <abc123@example.com>\r\n"
+    b"In-Reply-To: <prev@example.com>\r\n"
+    b"Content-Type: text/plain; charset=utf-8\r\n"
+    b"\r\n"
+    b"Hello team,\r\n"
+    b"the numbers are in.\r\n"
+)
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+
+@pytest.fixture
+def merged_cell_docx(tmp_path):
+    """A .docx with one 3x3 table containing vertical and horizontal merges."""
+    docx = pytest.importorskip("docx")
+
+    document = docx.Document()
+    document.add_paragraph("Intro paragraph")
+    table = document.add_table(rows=3, cols=3)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"c{r}{c}"
+
+    # c02 spans rows 0-2 of the last column; c10 spans columns 0-1 of row 1
+    top_right = table.cell(0, 2)
+    top_right.merge(table.cell(2, 2))
+    top_right.text = "c02"
+    left = table.cell(1, 0)
+    left.merge(table.cell(1, 1))
+    left.text = "c10"
+
+    path = tmp_path / "merged.docx"
+    document.save(str(path))
+    return path
+
+
+# A run holding a text box, written the way Word does: a DrawingML shape in
+# mc:Choice and a VML copy of the same text box in mc:Fallback
+TEXT_BOX_RUN = """
+<w:r xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+     xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+     xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+     xmlns:v="urn:schemas-microsoft-com:vml">
+  <mc:AlternateContent>
+    <mc:Choice Requires="wps">
+      <w:drawing><wps:txbx><w:txbxContent>
+        <w:p><w:r><w:t>BOXTEXT</w:t></w:r></w:p>
+      </w:txbxContent></wps:txbx></w:drawing>
+    </mc:Choice>
+    <mc:Fallback>
+      <w:pict><v:shape><v:textbox><w:txbxContent>
+        <w:p><w:r><w:t>BOXTEXT</w:t></w:r></w:p>
+      </w:txbxContent></v:textbox></v:shape></w:pict>
+    </mc:Fallback>
+  </mc:AlternateContent>
+</w:r>
+"""
+
+
+@pytest.fixture
+def text_box_docx(tmp_path):
+    """A .docx with a text box inside a body paragraph and inside a table cell."""
+    docx = pytest.importorskip("docx")
+    from docx.oxml import parse_xml
+
+    document = docx.Document()
+    paragraph = document.add_paragraph("Before ")
+    paragraph._p.append(parse_xml(TEXT_BOX_RUN))
+    paragraph.add_run("after")
+    paragraph.paragraph_format.tab_stops.add_tab_stop(docx.shared.Inches(1))
+
+    cell = document.add_table(rows=1, cols=2).cell(0, 0)
+    cell.text = "cell "
+    cell.paragraphs[0]._p.append(parse_xml(TEXT_BOX_RUN))
+    cell.paragraphs[0].add_run("end")
+
+    path = tmp_path / "text_box.docx"
+    document.save(str(path))
+    return path
+
+
+# =============================================================================
+# EMAIL PARSING TESTS
+# =============================================================================
+
+
+class TestParseEmail:
+    """Tests for _parse_email and the .eml extractor."""
+
+    def _parse_stdlib(self, raw, monkeypatch):
+        # A None entry in sys.modules makes the import raise ImportError
+        monkeypatch.setitem(sys.modules, "fast_mail_parser", None)
+        return converters._parse_email(raw)
+
+    def test_stdlib_metadata(self, monkeypatch):
+        metadata, body = self._parse_stdlib(SAMPLE_EML, monkeypatch)
+
+        assert metadata["email_from"] == "Alice Example <alice@example.com>"
+        assert metadata["email_to"] == "bob@example.com, carol@example.com"
+        assert metadata["email_message_id"] == "<abc123@example.com>"
+        assert "the numbers are in." in body
+
+    def test_fast_path_matches_stdlib(self, monkeypatch):
+        pytest.importorskip("fast_mail_parser")
+
+        fast_metadata, fast_body = converters._parse_email(SAMPLE_EML)
+        std_metadata, std_body = self._parse_stdlib(SAMPLE_EML, monkeypatch)
+
+        assert fast_metadata == std_metadata
+        assert all(isinstance(v, str) for v in fast_metadata.values())
+        assert fast_body.splitlines() == std_body.splitlines()
+
+    @pytest.mark.parametrize("use_stdlib", [False, True])
+    def test_emlx_parses_message_section(self, tmp_path, monkeypatch, use_stdlib):
+        if use_stdlib:
+            monkeypatch.setitem(sys.modules, "fast_mail_parser", None)
+        emlx_path = tmp_path / "sample.emlx"
+        emlx_path.write_bytes(
+            b"%d\n" % len(SAMPLE_EML)
+            + SAMPLE_EML
+            + b'<?xml version="1.0" encoding="UTF-8"?>\n<plist version="1.0"><dict>'
+            b"<key>flags</key><integer>1</integer></dict></plist>\n"
+        )
+
+        result = converters._extract_emlx(str(emlx_path))
+
+        assert result["metadata"]["email_subject"] == "Quarterly numbers"
+        assert "the numbers are in." in result["text"]
+
+    def test_eml_header_block_has_plain_strings(self, tmp_path):
+        eml_path = tmp_path / "sample.eml"
+        eml_path.write_bytes(SAMPLE_EML)
+
+        result = converters._extract_eml(str(eml_path))
+
+        assert "From: Alice Example <alice@example.com>\n" in result["text"]
+        assert "['" not in result["text"]
+
+
+# =============================================================================
+# DOCX EXTRACTION TESTS
+# =============================================================================
+
+
+class TestDocxTables:
+    """Tests for the streaming DOCX extractor's table handling."""
+
+    def test_vertical_merge_repeats_top_cell_text(self, merged_cell_docx):
+        result = converters._extract_docx_text(str(merged_cell_docx))
+
+        lines = result["text"].splitlines()
+        start = lines.index("=== TABLE 1 ===")
+        assert lines[start + 1:start + 4] == [
+            "c00 | c01 | c02",
+            "c10 | c02",
+            "c20 | c21 | c02",
+        ]
+
+    def test_matches_python_docx_cell_text(self, merged_cell_docx):
+        docx = pytest.importorskip("docx")
+        from itertools import groupby
+
+        expected = [
+            " | ".join(text for text, _ in groupby(c.text.strip() for c in row.cells))
+            for row in docx.Document(str(merged_cell_docx)).tables[0].rows
+        ]
+
+        text = converters._extract_docx_text(str(merged_cell_docx))["text"]
+
+        assert all(line in text.splitlines() for line in expected)
+
+    def test_text_box_content_is_not_spliced_into_paragraph(self, text_box_docx):
+        docx = pytest.importorskip("docx")
+        document = docx.Document(str(text_box_docx))
+
+        text = converters._extract_docx_text(str(text_box_docx))["text"]
+
+        assert "BOXTEXT" not in text
+        assert document.paragraphs[0].text == "Before after"
+        assert "Before after" in text.splitlines()
+        assert "cell end | " in text.splitlines()
+
+
+# =============================================================================
+# HTML TESTS
+# =============================================================================
+
+SAMPLE_HTML = (
+    "<html><head><title>T</title><style>p { color: red }</style>"
+    "<script>var x = 1;</script></head>"
+    "<body><p>Hello <b>world</b></p>\n<p>Fish &amp; chips</p></body></html>"
+)
+
+
+class TestStripHtml:
+    """Tests for _strip_html."""
+
+    def test_uses_same_engine_as_extract_html(self, tmp_path):
+        pytest.importorskip("selectolax.lexbor")
+        html_path = tmp_path / "page.html"
+        html_path.write_text(SAMPLE_HTML, encoding="utf-8")
+
+        assert converters._strip_html(SAMPLE_HTML) == converters._extract_html(str(html_path))["text"]
+
+    def test_stdlib_fallback_matches(self, monkeypatch):
+        pytest.importorskip("selectolax.lexbor")
+        expected = converters._strip_html(SAMPLE_HTML)
+
+        monkeypatch.setitem(sys.modules, "selectolax.lexbor", None)
+
+        assert converters._strip_html(SAMPLE_HTML) == expected == "T Hello world Fish & chips"
+
+
+# =============================================================================
+# MARKDOWN TESTS
+# =============================================================================
+
+
+class TestExtractMarkdown:
+    """Tests for _extract_md's table conversion."""
+
+    def test_tables_become_marked_blocks(self, tmp_path):
+        md_path = tmp_path / "doc.md"
+        md_path.write_text(
+            "# Title\n"
+            "| Name | Amount |\n"
+            "|------|:------:|\n"
+            "| Alice | 10 |\n"
+            "Between | tables\n"
+            "  | x | y |  \n",
+            encoding="utf-8",
+        )
+
+        result = converters._extract_md(str(md_path))
+
+        assert result["text"] == (
+            "# Title\n"
+            "=== TABLE 1 ===\nName | Amount\nAlice | 10\n=== END TABLE 1 ===\n"
+            "Between | tables\n"
+            "=== TABLE 2 ===\nx | y\n=== END TABLE 2 ===\n"
+        )
+
+    def test_table_at_end_without_newline(self, tmp_path):
+        md_path = tmp_path / "doc.md"
+        md_path.write_text("text\n| a | b |", encoding="utf-8")
+
+        assert converters._extract_md(str(md_path))["text"] == (
+            "text\n=== TABLE 1 ===\na | b\n=== END TABLE 1 ==="
+        )
+
+    def test_long_pipe_line_returns_quickly(self, tmp_path):
+        md_path = tmp_path / "pipes.md"
+        md_path.write_text("|" * 200_000 + "x\n" + "| " * 100_000 + "x\n", encoding="utf-8")
+
+        start = time.perf_counter()
+        result = converters._extract_md(str(md_path))
+
+        assert time.perf_counter() - start < 1.0
+        assert "=== TABLE" not in result["text"]
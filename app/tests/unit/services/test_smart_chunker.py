@@ -0,0 +1,233 @@
+"""
+Unit tests for the smart chunker.
+
+Tests cover:
+- Protected-pattern placeholders and their round-trip
+- Sentence splitting and small-chunk merging
+- Overlap between neighbouring chunks
+- The short-text fast path
+- The agentic outline's prompt budget
+- End-to-end output of smart_chunk on a fixed document
+"""
+
+import json
+
+import pytest
+
+from app.arkham.services.utils import smart_chunker
+from app.arkham.services.utils.smart_chunker import (
+    ChunkConfig,
+    chunk_with_overlap,
+    iter_smart_chunk,
+    smart_chunk,
+)
+
+
+DOCUMENT = (
+    "=== PAGE 1 START ===\n\n"
+    "Intro paragraph about the case.\n\n"
+    "The first witness called +1 (555) 123-4567 on Monday. She spoke for ten minutes. "
+    "The second call went to +380 44 123 45 67 later. Nobody answered it.\n\n"
+    "=== TABLE 1 ===\nname | phone\nAlice | 555-123-4567\n=== END TABLE 1 ===\n\n"
+    + "x" * 130 + "\n\n"
+    "Short tail.\n\n"
+    "=== PAGE 1 END ==="
+)
+
+TABLE = "=== TABLE 1 ===\nname | phone\nAlice | 555-123-4567\n=== END TABLE 1 ==="
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+
+@pytest.fixture
+def small_config():
+    """Chunk sizes small enough for DOCUMENT to exercise every split level."""
+    return ChunkConfig(max_chunk_size=80, min_chunk_size=30)
+
+
+# =============================================================================
+# PATTERN PROTECTION TESTS
+# =============================================================================
+
+
+class TestProtectPatterns:
+    """Tests for _protect_patterns / _restore_patterns."""
+
+    def test_placeholders_in_document_order(self):
+        protected, replacements = smart_chunker._protect_patterns(DOCUMENT)
+
+        assert replacements == {
+            0: "=== PAGE 1 START ===",
+            1: "+1 (555) 123-4567",
+            2: "+380 44 123 45 67",
+            3: TABLE,
+            4: "=== PAGE 1 END ===",
+        }
+        assert protected.startswith("__PROTECTED_0__\n\nIntro paragraph")
+        assert "called __PROTECTED_1__ on Monday" in protected
+        assert "\n\n__PROTECTED_3__\n\n" in protected
+        assert protected.endswith("Short tail.\n\n__PROTECTED_4__")
+
+    def test_repeated_match_shares_placeholder(self):
+        text = "Call 555-123-4567 today or 555-123-4567 tomorrow."
+
+        protected, replacements = smart_chunker._protect_patterns(text)
+
+        assert protected == "Call __PROTECTED_0__ today or __PROTECTED_0__ tomorrow."
+        assert replacements == {0: "555-123-4567"}
+
+    def test_round_trip(self):
+        protected, replacements = smart_chunker._protect_patterns(DOCUMENT)
+
+        assert smart_chunker._restore_patterns(protected, replacements) == DOCUMENT
+
+    def test_unknown_placeholder_left_alone(self):
+        assert smart_chunker._restore_patterns("a __PROTECTED_7__ b", {0: "x"}) == "a __PROTECTED_7__ b"
+
+
+# =============================================================================
+# SPLITTING AND MERGING TESTS
+# =============================================================================
+
+
+class TestSplitAndMerge:
+    """Tests for the sentence split and small-chunk merging."""
+
+    def test_split_by_sentences(self):
+        text = "One. Two! three? Four.  Five"
+
+        assert smart_chunker._split_by_sentences(text) == ["One.", "Two! three?", "Four.", "Five"]
+
+    def test_split_by_paragraphs_drops_blank_paragraphs(self):
+        text = "  first  \n\n\n\n second\n\n   \n\nthird"
+
+        assert smart_chunker._split_by_paragraphs(text) == ["first", "second", "third"]
+
+    def test_iter_split_falls_back_to_sentences_then_characters(self):
+        text = "Short para.\n\nAlpha beta gamma. Delta epsilon zeta. " + "Y" * 25
+
+        assert list(smart_chunker._iter_split(text, 20)) == [
+            "Short para.",
+            "Alpha beta gamma.",
+            "Delta epsilon zeta.",
+            "Y" * 20,
+            "Y" * 5,
+        ]
+
+    def test_merge_small_chunks(self):
+        chunks = ["a" * 5, "b" * 5, "c" * 20, "d" * 3]
+
+        assert list(smart_chunker._iter_merge_small_chunks(chunks, 10)) == [
+            "aaaaa\n\nbbbbb",
+            "c" * 20 + "\n\nddd",
+        ]
+
+    def test_merge_keeps_lone_small_chunk(self):
+        assert list(smart_chunker._iter_merge_small_chunks(["tiny"], 10)) == ["tiny"]
+        assert list(smart_chunker._iter_merge_small_chunks([], 10)) == []
+
+
+# =============================================================================
+# OVERLAP TESTS
+# =============================================================================
+
+
+class TestChunkWithOverlap:
+    """Tests for chunk_with_overlap."""
+
+    def test_overlap_from_both_neighbours(self):
+        chunks = ["abcdef", "ghijkl", "mnopqr"]
+
+        assert chunk_with_overlap(chunks, 2) == [
+            "abcdef ... gh",
+            "ef ... ghijkl ... mn",
+            "kl ... mnopqr",
+        ]
+
+    def test_single_chunk_unchanged(self):
+        assert chunk_with_overlap(["only"], 10) == ["only"]
+
+    def test_zero_overlap_returns_input(self):
+        chunks = ["a", "b"]
+
+        assert chunk_with_overlap(chunks, 0) is chunks
+
+
+# =============================================================================
+# SMART CHUNK TESTS
+# =============================================================================
+
+
+class TestSmartChunk:
+    """Tests for smart_chunk / iter_smart_chunk."""
+
+    def test_short_text_is_one_stripped_chunk(self):
+        text = "  Call +1 555 123 4567.\n\n\n\nThanks.  "
+
+        assert list(iter_smart_chunk(text)) == ["Call +1 555 123 4567.\n\n\n\nThanks."]
+
+    def test_blank_text_has_no_chunks(self):
+        assert smart_chunk("") == []
+        assert smart_chunk(" \n\n ") == []
+        assert list(iter_smart_chunk(" \n ")) == []
+
+    def test_document_output(self, small_config):
+        assert smart_chunk(DOCUMENT, small_config) == [
+            "=== PAGE 1 START ===\n\nIntro paragraph about the case.",
+            "The first witness called +1 (555) 123-4567 on Monday. She spoke for ten minutes.",
+            "The second call went to +380 44 123 45 67 later. Nobody answered it.",
+            TABLE + "\n\n" + "x" * 80,
+            "x" * 50 + "\n\nShort tail.\n\n=== PAGE 1 END ===",
+        ]
+
+    def test_protected_spans_never_split(self, small_config):
+        chunks = smart_chunk(DOCUMENT, small_config)
+
+        assert sum(TABLE in chunk for chunk in chunks) == 1
+        assert not any("__PROTECTED_" in chunk for chunk in chunks)
+
+    def test_iter_matches_list(self, small_config):
+        assert list(iter_smart_chunk(DOCUMENT, small_config)) == smart_chunk(DOCUMENT, small_config)
+
+
+# =============================================================================
+# AGENTIC OUTLINE TESTS
+# =============================================================================
+
+
+class TestAgenticOutline:
+    """Tests for the size budget of the outline sent to the LLM."""
+
+    def test_small_document_uses_full_edges(self):
+        paragraphs = ["a" * 200, "b" * 50]
+
+        outline = json.loads(smart_chunker._agentic_outline(paragraphs))
+
+        assert outline == [
+            {"i": 0, "len": 200, "head": "a" * 80, "tail": "a" * 80},
+            {"i": 1, "len": 50, "head": "b" * 50, "tail": ""},
+        ]
+
+    def test_edges_shrink_to_fit_budget(self):
+        paragraphs = ["p" * 500] * 60
+
+        outline = smart_chunker._agentic_outline(paragraphs)
+
+        assert len(outline) <= smart_chunker.AGENTIC_OUTLINE_MAX_CHARS
+        assert json.loads(outline)[0]["head"] == "p" * 40
+
+    def test_too_many_paragraphs_has_no_outline(self):
+        assert smart_chunker._agentic_outline(["p" * 500] * 300) is None
+
+    def test_over_budget_falls_back_without_llm(self, monkeypatch):
+        def _no_llm(*args, **kwargs):
+            raise AssertionError("LLM must not be called")
+
+        monkeypatch.setattr(smart_chunker, "chat_with_llm", _no_llm)
+        text = "\n\n".join(f"Paragraph {i} " + "word " * 100 for i in range(300))
+        config = ChunkConfig(max_chunk_size=512, min_chunk_size=100)
+
+        assert smart_chunker.agentic_chunk(text, config) == smart_chunk(text, config)
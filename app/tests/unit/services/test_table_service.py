@@ -0,0 +1,253 @@
+"""
+Unit tests for table_service.
+
+Tests cover:
+- Parsing stored table text_content (marker lines, separators)
+- The text-parse cache: copies handed out, invalidation on created_at
+- The CSV read cache
+- get_table_content against an in-memory database
+- One-time engine creation under concurrent first use
+"""
+
+import contextlib
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app.arkham.services import table_service
+from app.arkham.services.db.models import Document, ExtractedTable
+
+
+TEXT_TABLE = (
+    "=== TABLE 1 ===\n"
+    "Name | Amount\n"
+    "| --- | --- |\n"
+    "Alice | 10\n"
+    "\n"
+    "Bob | 20\n"
+    "=== END TABLE 1 ===\n"
+)
+
+PDF_TABLE = (
+    "TABLE (Page 3):\n"
+    "Name | Amount\n"
+    "--------------------------------------------------\n"
+    "Carol | 30\n"
+)
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty parse caches."""
+    table_service._text_parse_cache.clear()
+    table_service._read_csv_cached.cache_clear()
+    yield
+    table_service._text_parse_cache.clear()
+    table_service._read_csv_cached.cache_clear()
+
+
+@pytest.fixture
+def db_table(in_memory_db, monkeypatch):
+    """An ExtractedTable row with text_content only, served by _session()."""
+    document = Document(path="/tmp/doc.pdf", title="doc")
+    in_memory_db.add(document)
+    in_memory_db.flush()
+    table = ExtractedTable(
+        doc_id=document.id,
+        page_num=1,
+        row_count=2,
+        col_count=2,
+        text_content=TEXT_TABLE,
+        created_at=datetime(2024, 1, 1, 12, 0),
+    )
+    in_memory_db.add(table)
+    in_memory_db.commit()
+
+    @contextlib.contextmanager
+    def _session():
+        yield in_memory_db
+
+    monkeypatch.setattr(table_service, "_session", _session)
+    return table
+
+
+# =============================================================================
+# TEXT PARSING TESTS
+# =============================================================================
+
+
+class TestParseTableTextContent:
+    """Tests for _parse_table_text_content."""
+
+    def test_marker_format(self):
+        headers, rows = table_service._parse_table_text_content(TEXT_TABLE)
+
+        assert headers == ["Name", "Amount"]
+        assert rows == [["Alice", "10"], ["Bob", "20"]]
+
+    def test_pdf_format(self):
+        headers, rows = table_service._parse_table_text_content(PDF_TABLE)
+
+        assert headers == ["Name", "Amount"]
+        assert rows == [["Carol", "30"]]
+
+    def test_markers_only(self):
+        assert table_service._parse_table_text_content("=== TABLE 2 ===\n=== END TABLE 2 ===") == ([], [])
+
+    def test_inline_marker_is_kept_as_text(self):
+        # Markers are only recognised on their own line; one sharing a line
+        # with cells stays part of the cell text
+        headers, rows = table_service._parse_table_text_content(
+            "TABLE (Page 3): Name | Amount\nCarol | 30 === END TABLE 1 ==="
+        )
+
+        assert headers == ["TABLE (Page 3): Name", "Amount"]
+        assert rows == [["Carol", "30 === END TABLE 1 ==="]]
+
+    def test_marker_needs_a_number(self):
+        headers, _ = table_service._parse_table_text_content("=== TABLE X ===\nA | B")
+
+        assert headers == ["=== TABLE X ==="]
+
+
+# =============================================================================
+# CACHE TESTS
+# =============================================================================
+
+
+class TestParseTextCached:
+    """Tests for the (table_id, version) text-parse cache."""
+
+    def test_mutating_result_does_not_affect_next_call(self):
+        headers, rows = table_service._parse_text_cached(1, 1.0, TEXT_TABLE)
+        headers.append("extra")
+        rows[0][0] = "changed"
+        rows.clear()
+
+        assert table_service._parse_text_cached(1, 1.0, TEXT_TABLE) == (
+            ["Name", "Amount"],
+            [["Alice", "10"], ["Bob", "20"]],
+        )
+
+    def test_hit_ignores_text_argument(self):
+        table_service._parse_text_cached(1, 1.0, TEXT_TABLE)
+
+        assert table_service._parse_text_cached(1, 1.0, PDF_TABLE)[1] == [["Alice", "10"], ["Bob", "20"]]
+
+    def test_new_version_is_reparsed(self):
+        table_service._parse_text_cached(1, 1.0, TEXT_TABLE)
+
+        assert table_service._parse_text_cached(1, 2.0, PDF_TABLE)[1] == [["Carol", "30"]]
+
+    def test_cache_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(table_service, "_TEXT_PARSE_CACHE_SIZE", 2)
+        for table_id in range(3):
+            table_service._parse_text_cached(table_id, 1.0, TEXT_TABLE)
+
+        assert list(table_service._text_parse_cache) == [(1, 1.0), (2, 1.0)]
+
+
+class TestReadCsvCached:
+    """Tests for the CSV read cache behind get_table_content."""
+
+    def test_mutating_result_does_not_affect_next_call(self, in_memory_db, monkeypatch, tmp_path):
+        csv_path = tmp_path / "table.csv"
+        csv_path.write_text("Name,Amount\nAlice,10\n", encoding="utf-8")
+        document = Document(path="/tmp/doc.pdf", title="doc")
+        in_memory_db.add(document)
+        in_memory_db.flush()
+        table = ExtractedTable(
+            doc_id=document.id, page_num=1, row_count=1, col_count=2, csv_path=str(csv_path)
+        )
+        in_memory_db.add(table)
+        in_memory_db.commit()
+
+        @contextlib.contextmanager
+        def _session():
+            yield in_memory_db
+
+        monkeypatch.setattr(table_service, "_session", _session)
+
+        first = table_service.get_table_content(table.id)
+        first["headers"].append("extra")
+        first["rows"][0][0] = "changed"
+
+        second = table_service.get_table_content(table.id)
+        assert second["headers"] == ["Name", "Amount"]
+        assert second["rows"] == [["Alice", "10"]]
+
+
+# =============================================================================
+# GET TABLE CONTENT TESTS
+# =============================================================================
+
+
+class TestGetTableContent:
+    """Tests for get_table_content's text_content path."""
+
+    def test_mutating_result_does_not_affect_next_call(self, db_table):
+        first = table_service.get_table_content(db_table.id)
+        first["rows"][0][0] = "changed"
+        first["headers"].clear()
+
+        second = table_service.get_table_content(db_table.id)
+        assert second["headers"] == ["Name", "Amount"]
+        assert second["rows"] == [["Alice", "10"], ["Bob", "20"]]
+
+    def test_changed_created_at_invalidates_entry(self, db_table, in_memory_db):
+        assert table_service.get_table_content(db_table.id)["rows"][0] == ["Alice", "10"]
+
+        db_table.text_content = PDF_TABLE
+        db_table.created_at = datetime(2024, 6, 1, 12, 0)
+        in_memory_db.commit()
+
+        assert table_service.get_table_content(db_table.id)["rows"] == [["Carol", "30"]]
+
+    def test_missing_table(self, db_table):
+        assert table_service.get_table_content(db_table.id + 100) == {"error": "Table not found"}
+
+
+# =============================================================================
+# SESSION FACTORY TESTS
+# =============================================================================
+
+
+class TestSessionFactory:
+    """Tests for the lazily created engine behind _session()."""
+
+    def test_concurrent_first_use_creates_one_engine(self, monkeypatch):
+        import sqlalchemy
+
+        real_create_engine = sqlalchemy.create_engine
+        engines = []
+
+        def slow_create_engine(url, **kwargs):
+            time.sleep(0.05)  # Widen the window between check and assignment
+            engines.append(real_create_engine("sqlite://"))
+            return engines[-1]
+
+        monkeypatch.setattr(sqlalchemy, "create_engine", slow_create_engine)
+        monkeypatch.setattr(table_service, "_SessionLocal", None)
+
+        factories = []
+        barrier = threading.Barrier(8)
+
+        def first_use():
+            barrier.wait()
+            factories.append(table_service._get_sessionmaker())
+
+        threads = [threading.Thread(target=first_use) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(engines) == 1
+        assert all(factory is factories[0] for factory in factories)
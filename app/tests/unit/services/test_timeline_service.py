@@ -0,0 +1,126 @@
+"""
+Unit tests for timeline_service's date mention extraction.
+
+Tests cover:
+- extract_date_mentions matching the previous per-call string patterns
+- Digitless text being scanned with the relative-date pattern only
+"""
+
+import random
+import re
+
+import pytest
+from dateutil import parser as date_parser
+
+from app.arkham.services import timeline_service
+
+
+def _reference_date_mentions(text, context_chars=50):
+    """extract_date_mentions as it was before the patterns were precompiled."""
+    month = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?"
+    all_patterns = [
+        (r"\b" + month + r"\s+\d{1,2},?\s+\d{4}\b", "explicit"),
+        (r"\b\d{1,2}\s+" + month + r"\s+\d{4}\b", "explicit"),
+        (r"\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b", "explicit"),
+        (r"\b\d{4}[-/]\d{1,2}[-/]\d{1,2}\b", "explicit"),
+        (r"\b" + month + r"\s+\d{4}\b", "explicit"),
+        (r"\b\d{1,2}[-/]\d{4}\b", "explicit"),
+        (r"\b(19\d{2}|20\d{2})\b", "explicit"),
+        (r"\b(today|yesterday|tomorrow|last\s+\w+|next\s+\w+|\d+\s+(?:days?|weeks?|months?|years?)\s+ago)\b", "relative"),
+    ]
+
+    mentions = []
+    for pattern, date_type in all_patterns:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            start_pos, end_pos = match.start(), match.end()
+            parsed_date = None
+            try:
+                if date_type == "explicit":
+                    parsed_date = date_parser.parse(match.group(), fuzzy=True)
+            except (ValueError, TypeError):
+                pass
+            mentions.append(
+                {
+                    "date_text": match.group(),
+                    "parsed_date": parsed_date,
+                    "date_type": date_type,
+                    "context_before": text[max(0, start_pos - context_chars) : start_pos].strip(),
+                    "context_after": text[end_pos : min(len(text), end_pos + context_chars)].strip(),
+                    "position": start_pos,
+                }
+            )
+
+    unique_mentions = []
+    seen = set()
+    for mention in mentions:
+        key = (mention["date_text"], mention["position"])
+        if key not in seen:
+            seen.add(key)
+            unique_mentions.append(mention)
+    unique_mentions.sort(key=lambda x: x["position"])
+    return unique_mentions
+
+
+DIGITLESS_TEXTS = [
+    "",
+    "The board met yesterday and will meet again next Tuesday.",
+    "Last quarter the audit was delayed; tomorrow it resumes. Today is fine.",
+    "March was cold. The memo from May mentions nothing specific.",
+]
+
+DIGIT_TEXTS = [
+    "On March 15, 2023 the board met; minutes dated 15 March 2023.",
+    "Filed 03/15/2023, amended 2023-03-15 and again 15-03-23.",
+    "Invoices from March 2023 and 04/2023 were paid in 2024.",
+    "SSN 123-45-1999 appeared 3 weeks ago, last Friday and next month.",
+]
+
+
+class TestExtractDateMentions:
+    """Tests for extract_date_mentions' precompiled patterns."""
+
+    @pytest.mark.parametrize("text", DIGITLESS_TEXTS + DIGIT_TEXTS)
+    def test_matches_reference(self, text):
+        assert timeline_service.extract_date_mentions(text) == _reference_date_mentions(text)
+
+    def test_matches_reference_on_random_text(self):
+        rng = random.Random(0)
+        tokens = [
+            "March", "Mar.", "sep", "15", "2023", "1999", "03", "/", "-", ",",
+            "today", "last", "next", "week", "3", "days", "ago", "the", " ", "\n",
+        ]
+        for _ in range(300):
+            text = "".join(rng.choice(tokens) + rng.choice(["", " "]) for _ in range(rng.randint(0, 25)))
+            assert timeline_service.extract_date_mentions(text) == _reference_date_mentions(text)
+
+    def test_digitless_text_uses_relative_pattern_only(self, monkeypatch):
+        scanned = []
+
+        class RecordingPattern:
+            def __init__(self, regex):
+                self.regex = regex
+
+            def finditer(self, text):
+                scanned.append(self.regex.pattern)
+                return self.regex.finditer(text)
+
+        monkeypatch.setattr(
+            timeline_service,
+            "_DATE_PATTERNS",
+            [(RecordingPattern(regex), date_type) for regex, date_type in timeline_service._DATE_PATTERNS],
+        )
+        monkeypatch.setattr(
+            timeline_service, "_DIGITLESS_DATE_PATTERNS", timeline_service._DATE_PATTERNS[-1:]
+        )
+
+        mentions = timeline_service.extract_date_mentions("We spoke yesterday, not last week.")
+
+        assert scanned == [timeline_service._DATE_PATTERNS[-1][0].regex.pattern]
+        assert [(m["date_text"], m["date_type"]) for m in mentions] == [
+            ("yesterday", "relative"),
+            ("last week", "relative"),
+        ]
+
+        scanned.clear()
+        timeline_service.extract_date_mentions("Dated 2023.")
+        assert len(scanned) == len(timeline_service._DATE_PATTERNS)
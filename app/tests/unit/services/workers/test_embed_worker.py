@@ -0,0 +1,32 @@
+"""
+Unit tests for the embed worker's batch job.
+
+Tests cover:
+- embed_chunks_job embedding every chunk of a batch in order
+- Missing chunks being skipped without stopping the batch
+"""
+
+from sqlalchemy.orm import sessionmaker
+
+from app.arkham.services.workers import embed_worker
+
+
+class TestEmbedChunksJob:
+    """Tests for embed_chunks_job, the RQ job parse_minidoc_job enqueues."""
+
+    def test_embeds_each_chunk_in_order(self, monkeypatch):
+        seen = []
+        monkeypatch.setattr(embed_worker, "embed_chunk_job", seen.append)
+
+        embed_worker.embed_chunks_job([7, 3, 9])
+
+        assert seen == [7, 3, 9]
+
+    def test_missing_chunks_do_not_stop_the_batch(self, in_memory_db, monkeypatch):
+        monkeypatch.setattr(embed_worker, "Session", sessionmaker(bind=in_memory_db.get_bind()))
+        embedded = []
+        monkeypatch.setattr(embed_worker, "embed_hybrid", embedded.append)
+
+        embed_worker.embed_chunks_job([1, 2, 3])
+
+        assert embedded == []
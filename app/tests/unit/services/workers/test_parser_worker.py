@@ -0,0 +1,301 @@
+"""
+Unit tests for the parser worker's chunk loading.
+
+Tests cover:
+- parse_minidoc_job end to end on SQLite: stitching, chunk inserts,
+  derived rows, batched embed enqueue and the no-content short-circuit
+- COPY-based chunk loading against PostgreSQL (psycopg2 and psycopg 3)
+- Read-back of chunk IDs when a previous run left rows in the range
+- Serialisation of concurrent loads of the same chunk range
+
+The COPY tests need a scratch PostgreSQL database and are skipped unless
+TEST_DATABASE_URL points at one; every table in the models is created and
+dropped around each test.
+"""
+
+import os
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+from app.arkham.services import timeline_service
+from app.arkham.services.db.models import (
+    Base,
+    Chunk,
+    DateMention,
+    Document,
+    ExtractedTable,
+    MiniDoc,
+    PageOCR,
+    SensitiveDataMatch,
+)
+from app.arkham.services.utils.pattern_detector import detect_sensitive_data
+from app.arkham.services.utils.smart_chunker import ChunkConfig, smart_chunk
+from app.arkham.services.workers import chunk_analysis, parser_worker
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+CHUNK_TEXTS = [
+    "plain chunk",
+    "",
+    'quoted "text", with commas',
+    "multi\nline\r\nchunk",
+    "unicode: Zürich — 東京",
+    "trailing backslash \\",
+    "NULL",
+]
+
+PAGE_TEXT = (
+    "Page {page}. On March 15, 2023 the board met in the main office. "
+    "Minutes were sent to bob@example.com after the meeting. "
+    "The treasurer reported that the account balance had not changed since the last quarter. "
+    "Several members asked for the audit to be brought forward. "
+    "A follow-up meeting was scheduled and the chair closed the session. "
+    "Nobody objected to the proposed timetable or the budget for the review."
+)
+
+TABLE_TEXT = "=== TABLE 1 ===\nName | Amount\nAlice | 10\n=== END TABLE 1 ==="
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+
+@pytest.fixture
+def sqlite_worker(in_memory_db, monkeypatch):
+    """
+    Point parser_worker at the in-memory database with a mocked queue.
+
+    Timeline extraction runs for real apart from its LLM call.
+    """
+    monkeypatch.setattr(parser_worker, "Session", sessionmaker(bind=in_memory_db.get_bind()))
+    monkeypatch.setattr(parser_worker, "q", MagicMock())
+    redis_conn = MagicMock()
+    redis_conn.get.return_value = None
+    monkeypatch.setattr(parser_worker, "redis_conn", redis_conn)
+    monkeypatch.setattr(chunk_analysis, "_strategy_cache", {"value": None, "ts": 0.0})
+    monkeypatch.setattr(timeline_service, "extract_events_with_llm", lambda *args, **kwargs: [])
+    return in_memory_db
+
+
+def _add_minidoc(session, page_texts, tables=()):
+    """Add a document and a MiniDoc over pages 3.. with the given page texts."""
+    document = Document(path="/tmp/doc.pdf", title="doc")
+    session.add(document)
+    session.flush()
+    minidoc = MiniDoc(
+        document_id=document.id,
+        minidoc_id="hash__part_1",
+        page_start=3,
+        page_end=3 + len(page_texts) - 1,
+        status="ocr_done",
+    )
+    session.add(minidoc)
+    # Insert pages out of order; the stitching query sorts them
+    for page_num, text in reversed(list(enumerate(page_texts, start=3))):
+        session.add(PageOCR(document_id=document.id, page_num=page_num, text=text))
+    for page_num, text in tables:
+        session.add(ExtractedTable(
+            doc_id=document.id, page_num=page_num, row_count=1, col_count=2, text_content=text
+        ))
+    session.commit()
+    return document.id, minidoc.id
+
+
+@pytest.fixture(params=["psycopg2", "psycopg"])
+def pg_sessionmaker(request):
+    """A sessionmaker on an empty copy of the schema, once per driver."""
+    if not TEST_DATABASE_URL or not TEST_DATABASE_URL.startswith("postgresql"):
+        pytest.skip("TEST_DATABASE_URL is not set to a PostgreSQL database")
+    pytest.importorskip(request.param)
+
+    url = make_url(TEST_DATABASE_URL).set(drivername=f"postgresql+{request.param}")
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    try:
+        yield sessionmaker(bind=engine)
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+@pytest.fixture
+def doc_id(pg_sessionmaker):
+    with pg_sessionmaker() as session:
+        document = Document(path="/tmp/big.pdf", title="big")
+        session.add(document)
+        session.commit()
+        return document.id
+
+
+def _chunk_texts(session, chunk_ids):
+    texts = dict(session.execute(select(Chunk.id, Chunk.text).where(Chunk.id.in_(chunk_ids))).all())
+    return [texts[chunk_id] for chunk_id in chunk_ids]
+
+
+# =============================================================================
+# PARSE JOB TESTS
+# =============================================================================
+
+
+class TestParseMinidocJob:
+    """End-to-end tests for parse_minidoc_job on SQLite."""
+
+    def test_chunks_and_derived_rows(self, sqlite_worker):
+        session = sqlite_worker
+        page_texts = [PAGE_TEXT.format(page=page) for page in (3, 4, 5)]
+        doc_id, minidoc_id = _add_minidoc(session, page_texts, tables=[(4, TABLE_TEXT)])
+
+        parser_worker.parse_minidoc_job(minidoc_id)
+
+        stitched = (
+            f"=== PAGE 3 START ===\n{page_texts[0]}\n=== PAGE 3 END ===\n\n"
+            f"=== PAGE 4 START ===\n{page_texts[1]}\n\n{TABLE_TEXT}\n=== PAGE 4 END ===\n\n"
+            f"=== PAGE 5 START ===\n{page_texts[2]}\n=== PAGE 5 END ===\n\n"
+        )
+        expected_texts = smart_chunk(stitched, ChunkConfig(max_chunk_size=512, min_chunk_size=100))
+        assert len(expected_texts) > 2
+
+        session.expire_all()
+        assert session.get(MiniDoc, minidoc_id).status == "parsed"
+        chunks = session.scalars(select(Chunk).order_by(Chunk.id)).all()
+        assert [chunk.text for chunk in chunks] == expected_texts
+        assert [chunk.chunk_index for chunk in chunks] == [3_000_000 + i for i in range(len(chunks))]
+        assert all(chunk.doc_id == doc_id for chunk in chunks)
+
+        mentions = session.scalars(select(DateMention)).all()
+        assert len(mentions) == sum(
+            len(timeline_service.extract_date_mentions(chunk.text)) for chunk in chunks
+        )
+        assert sorted(m.chunk_id for m in mentions) == sorted(
+            chunk.id for chunk in chunks for _ in timeline_service.extract_date_mentions(chunk.text)
+        )
+        assert "March 15, 2023" in {m.date_text for m in mentions}
+
+        sensitive = session.execute(
+            select(SensitiveDataMatch.chunk_id, SensitiveDataMatch.pattern_type, SensitiveDataMatch.start_pos)
+        ).all()
+        assert sorted(sensitive) == sorted(
+            (chunk.id, match.pattern_type, match.start_pos)
+            for chunk in chunks
+            for match in detect_sensitive_data(chunk.text)
+        )
+        assert any(pattern_type == "email" for _, pattern_type, _ in sensitive)
+
+    def test_embed_jobs_are_batched(self, sqlite_worker, monkeypatch):
+        session = sqlite_worker
+        monkeypatch.setattr(parser_worker, "EMBED_BATCH_SIZE", 2)
+        page_texts = [PAGE_TEXT.format(page=page) for page in (3, 4, 5)]
+        _, minidoc_id = _add_minidoc(session, page_texts)
+
+        parser_worker.parse_minidoc_job(minidoc_id)
+
+        chunk_ids = session.scalars(select(Chunk.id).order_by(Chunk.id)).all()
+        assert len(chunk_ids) > 2
+
+        # One enqueue_many call carrying every chunk ID, in order, in batches
+        parser_worker.q.enqueue_many.assert_called_once()
+        jobs = parser_worker.q.enqueue_many.call_args.args[0]
+        assert [len(job.kwargs["chunk_ids"]) for job in jobs[:-1]] == [2] * (len(jobs) - 1)
+        assert [cid for job in jobs for cid in job.kwargs["chunk_ids"]] == chunk_ids
+        assert {job.func for job in jobs} == {"app.arkham.services.workers.embed_worker.embed_chunks_job"}
+
+    def test_blank_pages_are_marked_parsed_without_chunks(self, sqlite_worker):
+        session = sqlite_worker
+        _, minidoc_id = _add_minidoc(session, ["", "   \n  ", None])
+
+        parser_worker.parse_minidoc_job(minidoc_id)
+
+        session.expire_all()
+        assert session.get(MiniDoc, minidoc_id).status == "parsed"
+        assert session.scalars(select(Chunk)).all() == []
+        parser_worker.q.enqueue_many.assert_not_called()
+
+    def test_table_on_blank_page_is_content(self, sqlite_worker):
+        session = sqlite_worker
+        _, minidoc_id = _add_minidoc(session, [""], tables=[(3, TABLE_TEXT)])
+
+        parser_worker.parse_minidoc_job(minidoc_id)
+
+        session.expire_all()
+        chunks = session.scalars(select(Chunk)).all()
+        assert [chunk.text for chunk in chunks] == [
+            f"=== PAGE 3 START ===\n\n\n{TABLE_TEXT}\n=== PAGE 3 END ==="
+        ]
+        parser_worker.q.enqueue_many.assert_called_once()
+
+    def test_missing_minidoc_is_a_no_op(self, sqlite_worker):
+        parser_worker.parse_minidoc_job(12345)
+
+        parser_worker.q.enqueue_many.assert_not_called()
+
+
+# =============================================================================
+# COPY LOADING TESTS
+# =============================================================================
+
+
+class TestCopyChunks:
+    """Tests for _copy_chunks against a real PostgreSQL."""
+
+    def test_round_trips_text_in_order(self, pg_sessionmaker, doc_id):
+        with pg_sessionmaker() as session:
+            chunk_ids = parser_worker._copy_chunks(session, doc_id, 5_000_000, CHUNK_TEXTS)
+            session.commit()
+
+            assert len(chunk_ids) == len(CHUNK_TEXTS)
+            assert _chunk_texts(session, chunk_ids) == CHUNK_TEXTS
+
+            rows = session.execute(
+                select(Chunk.chunk_index, Chunk.created_at)
+                .where(Chunk.id.in_(chunk_ids))
+                .order_by(Chunk.id)
+            ).all()
+            assert [index for index, _ in rows] == list(range(5_000_000, 5_000_000 + len(CHUNK_TEXTS)))
+            assert all(created_at is not None for _, created_at in rows)
+
+    def test_skips_rows_left_by_previous_run(self, pg_sessionmaker, doc_id):
+        with pg_sessionmaker() as session:
+            stale = Chunk(doc_id=doc_id, text="stale", chunk_index=1_000_001)
+            session.add(stale)
+            session.commit()
+
+            chunk_ids = parser_worker._copy_chunks(session, doc_id, 1_000_000, CHUNK_TEXTS)
+            session.commit()
+
+            assert stale.id not in chunk_ids
+            assert _chunk_texts(session, chunk_ids) == CHUNK_TEXTS
+
+    def test_concurrent_load_of_same_range_waits(self, pg_sessionmaker, doc_id):
+        first = pg_sessionmaker()
+        first_ids = parser_worker._copy_chunks(first, doc_id, 0, CHUNK_TEXTS)
+
+        second_ids = []
+        second_done = threading.Event()
+
+        def load_again():
+            with pg_sessionmaker() as second:
+                second_ids.extend(parser_worker._copy_chunks(second, doc_id, 0, CHUNK_TEXTS))
+                second.commit()
+            second_done.set()
+
+        thread = threading.Thread(target=load_again)
+        thread.start()
+        try:
+            # The second load blocks on the advisory lock until the first commits
+            assert not second_done.wait(timeout=1)
+            first.commit()
+            thread.join(timeout=10)
+        finally:
+            first.close()
+
+        assert second_done.is_set()
+        assert set(first_ids).isdisjoint(second_ids)
+        with pg_sessionmaker() as session:
+            assert _chunk_texts(session, second_ids) == CHUNK_TEXTS